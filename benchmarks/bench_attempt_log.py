@@ -0,0 +1,64 @@
+"""
+回答ログ書き込みのベンチマーク
+
+  python benchmarks/bench_attempt_log.py [スレッド数] [1スレッドあたりの件数]
+
+多数のセッション（スレッド）から同時に record() し、
+  - record() 1回の所要時間（再実行側が待つ時間）
+  - flush() までの合計時間と書き込み件数/秒
+を測る。
+"""
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from spi_core.attempt_log import AttemptLog  # noqa: E402
+
+
+def main() -> None:
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    per_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    work = tempfile.mkdtemp(prefix="spi-log-")
+    try:
+        log = AttemptLog(os.path.join(work, "attempts.sqlite3"))
+        latencies = [None] * threads
+
+        def session(k: int) -> None:
+            lat = np.empty(per_thread)
+            sid = f"session-{k}"
+            for i in range(per_thread):
+                t0 = time.perf_counter()
+                log.record(sid, i % 167, i % 5, i % 3 == 0, 12.5)
+                lat[i] = time.perf_counter() - t0
+            latencies[k] = lat
+
+        t0 = time.perf_counter()
+        workers = [threading.Thread(target=session, args=(k,)) for k in range(threads)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        enqueued = time.perf_counter() - t0
+        log.flush()
+        total = time.perf_counter() - t0
+        log.close()
+
+        lat = np.concatenate(latencies) * 1e6
+        n = threads * per_thread
+        print(f"{threads} スレッド x {per_thread:,} 件 = {n:,} 件（書き込み {log.written:,} 件）")
+        print(f"  record() p50 {np.percentile(lat, 50):.1f} us / p99 {np.percentile(lat, 99):.1f} us"
+              f" / max {lat.max():.0f} us")
+        print(f"  積み終わり {enqueued:.2f} 秒 / flush 完了 {total:.2f} 秒（{n / total:,.0f} 件/秒）")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
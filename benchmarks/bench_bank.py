@@ -0,0 +1,82 @@
+"""
+コンパイル済みバンクの起動時間・再読込時間のベンチマーク
+
+  python benchmarks/bench_bank.py [行数]
+
+行数を指定すると、実CSVの行を繰り返して水増ししたCSVで測る。
+  before : CSV を読んで検証し QuestionStore を作る（従来の起動）
+  compile: CSV → バンクファイル（オフライン、またはソース更新時に裏で実行）
+  startup: バンクファイルを読んで QuestionStore を作る
+  reload : ソースCSVの更新を検知してから新しいストアに差し替わるまで
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from spi_core.bank import BankHandle, load_bank, write_bank  # noqa: E402
+from spi_core.compiler import Unit, build_bank, load_questions  # noqa: E402
+from spi_core.store import QuestionStore  # noqa: E402
+
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "spi_questions_converted.csv")
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+    work = tempfile.mkdtemp(prefix="spi-bank-")
+    try:
+        src = os.path.join(work, "questions.csv")
+        bank = os.path.join(work, "questions.bank")
+        if rows:
+            df = pd.read_csv(CSV_PATH, dtype=str, keep_default_na=False, na_filter=False, encoding="utf-8")
+            df = pd.concat([df] * (rows // len(df) + 1), ignore_index=True).iloc[:rows]
+            df["question"] = df["question"] + "（" + df.index.astype(str) + "）"  # 重複として除外されないように
+            df.to_csv(src, index=False, encoding="utf-8")
+        else:
+            shutil.copyfile(CSV_PATH, src)
+
+        _, before = timed(lambda: QuestionStore.from_frame(load_questions(Unit(src, None), work)[0]))
+        (header, payload, _), compile_s = timed(lambda: build_bank([src], bank))
+        write_bank(bank, header, payload)
+        _, startup = timed(lambda: load_bank(bank))
+        handle, handle_s = timed(lambda: BankHandle(bank, [src], check_interval=0.0))
+
+        # ソースを書き換えて、差し替え完了までを測る
+        with open(src, "a", encoding="utf-8") as f:
+            f.write("追加された問題,,a,b,c,d,e,A,,言語,20.0,,,,\n")
+        os.utime(src, None)
+        version = handle.version
+        t0 = time.perf_counter()
+        worst_current = 0.0
+        while handle.version == version or handle.last_reload_seconds is None:
+            t1 = time.perf_counter()
+            handle.current()
+            worst_current = max(worst_current, time.perf_counter() - t1)
+            time.sleep(0.001)
+        reload_wall = time.perf_counter() - t0
+
+        print(f"{header['rows']:,} 問（バンク {os.path.getsize(bank) / 1024:,.0f} KiB）")
+        print(f"  before  CSV → ストア              : {before * 1000:8.1f} ms")
+        print(f"  compile CSV → バンク              : {compile_s * 1000:8.1f} ms")
+        print(f"  startup バンク → ストア            : {startup * 1000:8.1f} ms")
+        print(f"  startup BankHandle（最新バンクあり）: {handle_s * 1000:8.1f} ms")
+        print(f"  reload  検知 → 差し替え            : {reload_wall * 1000:8.1f} ms"
+              f"（裏スレッド {handle.last_reload_seconds * 1000:.1f} ms）")
+        print(f"  reload 中の current() 最大         : {worst_current * 1e6:8.1f} us")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+進行状況のチェックポイントのベンチマーク
+
+  python benchmarks/bench_checkpoint.py [出題数]
+
+回答のたびに保存する状態（途中まで解いた N 問分）について
+  - pickle（dict をそのまま）
+  - checkpoint（spi_core.checkpoint の固定形式）
+の1回あたりの書き出し・読み込み時間とサイズを比べ、復元した値が一致するか（時刻は誤差の最大）を確かめる。
+あわせて SQLite の保存先に1回保存する時間も出す。
+"""
+import os
+import pickle
+import sys
+import tempfile
+import time
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from spi_core.checkpoint import TIME_FIELDS, decode_checkpoint, encode_checkpoint  # noqa: E402
+from spi_core.sessions import SQLiteSessionBackend  # noqa: E402
+
+REPEAT = 5
+
+
+def sample_state(n: int) -> dict:
+    """N 問中、半分まで解いた「1問ごと」モードの状態"""
+    rng = np.random.default_rng(0)
+    now = time.time()
+    done = n // 2
+    start = np.full(n, np.nan)
+    start[:done + 1] = now + np.cumsum(rng.uniform(5, 60, done + 1))
+    end = np.full(n, np.nan)
+    end[:done] = start[:done] + rng.uniform(3, 50, done)
+    return {
+        "page": "quiz", "q_index": done, "stage": "quiz",
+        "answers": np.where(np.arange(n) < done, rng.integers(-1, 5, n), -1).astype(np.int8),
+        "start_times": start, "deadlines": start + 60, "time_limits": np.full(n, 60.0),
+        "exam_deadline": float("inf"), "end_times": end, "session_id": os.urandom(16).hex(), "bank_digest": os.urandom(32).hex(),
+        "question_ids": rng.choice(10_000, n, replace=False).astype(np.int32), "category": "非言語",
+        "num_questions": n, "mode": "その都度採点", "time_limit": 60, "time_mode": "1問ごと",
+    }
+
+
+def per_call(fn) -> float:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=REPEAT, number=number)) / number
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    state = sample_state(n)
+
+    data = encode_checkpoint(state)
+    restored = decode_checkpoint(data)
+    for k, v in state.items():
+        if k in TIME_FIELDS:
+            continue
+        same = np.array_equal(v, restored[k]) if isinstance(v, np.ndarray) else v == restored[k]
+        assert same, k
+    err = max(np.nanmax(np.abs(restored[k] - state[k])) for k in TIME_FIELDS)
+    assert all(np.array_equal(np.isnan(state[k]), np.isnan(restored[k])) for k in TIME_FIELDS)
+
+    pickled = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+    print(f"{n} 問の状態（時刻の誤差 最大 {err * 1e3:.3f} ms）")
+    for label, enc, dec, size in (
+        ("pickle", lambda: pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL), lambda: pickle.loads(pickled),
+         len(pickled)),
+        ("checkpoint", lambda: encode_checkpoint(state), lambda: decode_checkpoint(data), len(data)),
+    ):
+        print(f"  {label:<10} 書き出し {per_call(enc) * 1e6:7.1f} µs  読み込み {per_call(dec) * 1e6:7.1f} µs  "
+              f"{size:6,} バイト")
+
+    with tempfile.TemporaryDirectory() as work:
+        backend = SQLiteSessionBackend(os.path.join(work, "sessions.sqlite3"))
+        save = per_call(lambda: backend.save("token", state))
+        load = per_call(lambda: backend.load("token"))
+        print(f"  SQLite     保存     {save * 1e6:7.1f} µs  読み込み {load * 1e6:7.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
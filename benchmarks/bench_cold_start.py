@@ -0,0 +1,87 @@
+"""
+起動時間のベンチマーク
+
+  python benchmarks/bench_cold_start.py [スクリプト] [回数]
+
+1. import の時間：アプリ本体（spi_core.app）の import を新しいプロセスで -X importtime 付きで実行し、
+   合計時間・重いモジュール上位・pandas / pyarrow を読み込んだかを出す（バンクの読込まで含む）。
+2. 最初の描画までの時間：streamlit run を新しく起動し、サーバーが応答するまで / 最初の画面の
+   再実行が終わるまで（プロセス起動から）を測る。バンクは事前に作ってある状態で測る。
+   回答ログ・進行状況は一時フォルダ（SPI_DATA_DIR）に書かせる。
+"""
+import asyncio
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+from websockets.asyncio.client import connect
+
+from bench_reruns import Browser, free_port, start_server
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+TOP_MODULES = 8
+
+# アプリ本体の import とバンクの読込（select / quiz 画面までに通るもの）
+APP_IMPORTS = """
+from spi_core import app
+from spi_core.bank import BankHandle
+BankHandle(app.BANK_FILENAME, [app.CSV_FILENAME]).current()
+import sys
+print("heavy:", ",".join(m for m in ("pandas", "pyarrow") if m in sys.modules) or "-", file=sys.stderr)
+"""
+
+
+def import_profile() -> None:
+    res = subprocess.run([sys.executable, "-X", "importtime", "-c", APP_IMPORTS], cwd=ROOT,
+                         capture_output=True, text=True, check=True)
+    total, rows = 0, []
+    for line in res.stderr.splitlines():
+        m = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)", line)
+        if not m:
+            continue
+        depth = len(m.group(3)) // 2  # 字下げ 1 文字がトップレベル、以降 2 文字ずつ
+        if depth == 0:
+            total += int(m.group(2))  # 累計は子を含む
+        if depth <= 1:  # spi_core.app が何に時間を使っているかまで出す
+            rows.append((int(m.group(2)), "  " * depth + m.group(4)))
+    heavy = re.search(r"heavy: (\S+)", res.stderr).group(1)
+    print(f"import 合計 {total / 1e3:.0f} ms（pandas / pyarrow の読込：{heavy}）")
+    for us, name in sorted(rows, reverse=True)[:TOP_MODULES]:
+        print(f"  {us / 1e3:7.1f} ms  {name}")
+
+
+async def first_render(port: int) -> None:
+    async with connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"], max_size=None) as ws:
+        await Browser(ws).rerun()
+
+
+def cold_start(script: str) -> tuple:
+    port = free_port()
+    with tempfile.TemporaryDirectory(prefix="spi-bench-data-") as data_dir:
+        t0 = time.perf_counter()
+        proc = start_server(script, port, data_dir)
+        try:
+            ready = time.perf_counter() - t0
+            asyncio.run(first_render(port))
+            return ready, time.perf_counter() - t0
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+def main() -> None:
+    script = sys.argv[1] if len(sys.argv) > 1 else "spi_app_20q.py"
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    import_profile()
+    cold_start(script)  # バンクが無ければここで作られる（計測には含めない）
+    times = np.array([cold_start(script) for _ in range(rounds)])
+    print(f"起動（{rounds} 回の中央値）：サーバー応答まで {np.median(times[:, 0]):.2f} 秒 / "
+          f"最初の描画まで {np.median(times[:, 1]):.2f} 秒")
+
+
+if __name__ == "__main__":
+    main()
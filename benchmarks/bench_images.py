@@ -0,0 +1,79 @@
+"""
+画像アセットのベンチマーク
+
+  python benchmarks/bench_images.py [画像数] [幅px]
+
+一時フォルダに大きめの PNG を作り、1回の描画で画像を用意するコストを比べる。
+  - 従来：os.path.exists してからファイルを丸ごと読む（st.image にパスを渡すのと同等）
+  - 今回：解決済みの参照を引き、LRU から縮小済みバイト列を取る
+あわせて、ブラウザへ送るバイト数（元画像 / 縮小後）も表示する。
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from spi_core.assets import ImageAssets  # noqa: E402
+from spi_core.store import QuestionStore  # noqa: E402
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 2400
+    from PIL import Image
+
+    work = tempfile.mkdtemp(prefix="spi-img-")
+    try:
+        images_dir = os.path.join(work, "images")
+        os.makedirs(images_dir)
+        rng = np.random.default_rng(0)
+        names = []
+        for i in range(count):
+            # ノイズ入りにして圧縮が効きすぎないようにする
+            pixels = rng.integers(0, 32, (width * 2 // 3, width, 3), dtype=np.uint8) + 180
+            names.append(f"q{i}.png")
+            Image.fromarray(pixels).save(os.path.join(images_dir, names[-1]))
+
+        store = QuestionStore(np.arange(count), {
+            "question": [f"q{i}" for i in range(count)],
+            "answer": [0] * count,
+            "category": ["非言語"] * count,
+            "image": names,
+        })
+        rows = [store.question(i) for i in range(count)]
+
+        t0 = time.perf_counter()
+        assets = ImageAssets(images_dir)
+        assets.prepare(store)
+        for q in rows:
+            assets.data(assets.ref(q))  # 先読みの完了を待つ代わりに揃えておく
+        prepare = time.perf_counter() - t0
+
+        def old_render(q):
+            path = os.path.join(images_dir, q.image[1])
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    return f.read()
+
+        def new_render(q):
+            return assets.data(assets.ref(q))
+
+        for label, fn in (("従来（exists + 読込）", old_render), ("今回（参照 + LRU）", new_render)):
+            rounds = 20
+            t0 = time.perf_counter()
+            for _ in range(rounds):
+                sent = sum(len(fn(q)) for q in rows)
+            per = (time.perf_counter() - t0) / (rounds * count)
+            print(f"{label:<22} {per * 1e6:9.1f} µs/画像  送信 {sent / count / 1024:8.1f} KB/画像")
+        print(f"準備（解決・縮小）     {prepare:.2f} 秒 / {count} 枚  キャッシュ {assets.cached_bytes / 1024:.0f} KB")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
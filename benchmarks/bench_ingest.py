@@ -0,0 +1,63 @@
+"""
+取り込み時の文字列掃除のベンチマーク
+
+  python benchmarks/bench_ingest.py [行数]
+
+CSV を指定の行数まで繰り返した表で、全列の掃除（safe_str 相当）と正解の整数化を
+  - 1セルずつ：safe_str / normalize_answer_letter をセルごとに呼ぶ（従来の描画時の処理）
+  - 列ごと  ：clean_series / normalize_answer_series（コンパイル時に一度だけ）
+で比べる。描画時の掃除はなくなったので、再実行ごとのコストは 0 になる。
+"""
+import os
+import sys
+import time
+import unicodedata
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from spi_core.compiler import REQUIRED_COLUMNS, Unit, normalize_answer_series, read_unit  # noqa: E402
+from spi_core.display import clean_series, safe_str  # noqa: E402
+from spi_core.scoring import ANSWER_LETTERS  # noqa: E402
+
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "spi_questions_converted.csv")
+CODE = {letter: i for i, letter in enumerate(ANSWER_LETTERS)}
+NUMBERS = {str(i + 1): letter for i, letter in enumerate(ANSWER_LETTERS)}
+
+
+def normalize_answer_letter(x) -> int:
+    s = unicodedata.normalize("NFKC", safe_str(x)).lower()
+    s = NUMBERS.get(s, s)
+    return CODE.get(s, -1)
+
+
+def per_cell(df: pd.DataFrame) -> None:
+    for c in REQUIRED_COLUMNS:
+        [safe_str(x) for x in df[c]]
+    [normalize_answer_letter(x) for x in df["answer"]]
+
+
+def per_column(df: pd.DataFrame) -> None:
+    for c in REQUIRED_COLUMNS:
+        clean_series(df[c])
+    normalize_answer_series(clean_series(df["answer"])).map(CODE).fillna(-1).astype("int8")
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    base = read_unit(Unit(CSV_PATH, None))
+    for c in REQUIRED_COLUMNS:
+        if c not in base.columns:
+            base[c] = ""
+    df = pd.concat([base] * (rows // len(base) + 1), ignore_index=True).iloc[:rows]
+
+    for label, fn in (("1セルずつ", per_cell), ("列ごと", per_column)):
+        t0 = time.perf_counter()
+        fn(df)
+        sec = time.perf_counter() - t0
+        print(f"{label:<8} {sec * 1e3:9.1f} ms  {rows / sec / 1e6:6.2f} M行/秒（{len(REQUIRED_COLUMNS) + 1} 列）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+数式変換（auto_math_to_latex）の照合とベンチマーク
+
+  python benchmarks/bench_math.py [ファジングの件数]
+  python benchmarks/bench_math.py --save-golden   # 問題ファイルに増えたセルの期待値を math_golden.json に足す
+
+1. 照合：問題ファイル（CSV / XLSX）の全列・全セルと、ルート表記・分数・全角数字を組み合わせたランダムな文字列について、
+   MATH_RULES を1つずつ順に当てる従来の実装と出力が完全に一致するかを確かめる（1件でも違えば終了コード 1）。
+   あわせて、表示列のセルについて保存しておいた期待値（math_golden.json。一括変換に変える前の
+   auto_math_to_latex の出力）とも比べる。規則や従来の実装の側が変わってもここで気づける。
+2. 速度：1秒あたりの変換件数を
+   - 順に6回：re.sub を規則の数だけ（従来）
+   - 1回の走査：まとめた正規表現（LRU なし）
+   - LRU あり：同じ文字列は覚えておいた結果を返す
+   で比べる。あわせて列版（math_to_latex_series）の時間も出す。
+"""
+import glob
+import json
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from spi_core.compiler import expand_units, read_unit  # noqa: E402
+from spi_core.display import (  # noqa: E402
+    DISPLAY_FIELDS, MATH_RULES, apply_math_rules, auto_math_to_latex, clean_series, convert_math,
+    math_to_latex_series, safe_str,
+)
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), "math_golden.json")
+# 全角数字・アラビア数字も \d には当たる（ルートの [0-9] には当たらない）
+TOKENS = ["sqrt", "sqrt(", "ルート", "ルート(", "√", "√(", "(", ")", " ", "/", " / ", "1", "2", "12", "0",
+          "１", "２", "１２", "٣", "a", "x", "b2", "+", "-", "$", "\\frac", "\\sqrt", "答え", "、", '"', "nan"]
+
+
+def legacy(x) -> str:
+    """従来の auto_math_to_latex（規則を1つずつ順に当てる）"""
+    if not x:
+        return ""
+    s = safe_str(x)
+    if "$" in s or "\\frac" in s or "\\sqrt" in s:
+        return s
+    return apply_math_rules(s)
+
+
+def legacy_series(col: pd.Series) -> pd.Series:
+    """従来の math_to_latex_series（str.replace を規則の数だけ）"""
+    s = clean_series(clean_series(col))
+    has_math = (s.str.contains("$", regex=False) | s.str.contains("\\frac", regex=False)
+                | s.str.contains("\\sqrt", regex=False))
+    target = s[~has_math]
+    for pattern, repl in MATH_RULES:
+        target = target.str.replace(pattern, repl, regex=True)
+    s = s.copy()
+    s[~has_math] = target
+    return s
+
+
+def bank_cells() -> list:
+    """問題ファイルの全列・全セル（表示と同じく safe_str を通す前の値）"""
+    paths = sorted(glob.glob(os.path.join(ROOT, "*.csv")) + glob.glob(os.path.join(ROOT, "*.xlsx")))
+    cells = []
+    for unit in expand_units(paths):
+        df = read_unit(unit)
+        for c in df.columns:
+            cells.extend(df[c].tolist())
+    return cells
+
+
+def display_cells() -> list:
+    """問題ファイルの表示列（DISPLAY_FIELDS）のセル（重複なし）"""
+    paths = sorted(glob.glob(os.path.join(ROOT, "*.csv")) + glob.glob(os.path.join(ROOT, "*.xlsx")))
+    cells = set()
+    for unit in expand_units(paths):
+        df = read_unit(unit)
+        for c in DISPLAY_FIELDS:
+            if c in df.columns:
+                cells.update(df[c].tolist())
+    return sorted(cells)
+
+
+def load_golden() -> dict:
+    with open(GOLDEN_PATH, encoding="utf-8") as f:
+        return dict(json.load(f)["cases"])
+
+
+def save_golden() -> None:
+    """今の問題ファイルで期待値の無いセルだけ、従来の実装の出力を足す（既存の期待値は書き換えない）"""
+    golden = load_golden()
+    added = {x: legacy(x) for x in display_cells() if x not in golden}
+    golden.update(added)
+    lines = [json.dumps([x, y], ensure_ascii=False) for x, y in sorted(golden.items())]
+    with open(GOLDEN_PATH, "w", encoding="utf-8") as f:
+        f.write('{"fields": ' + json.dumps(DISPLAY_FIELDS) + ', "cases": [\n' + ",\n".join(lines) + "\n]}\n")
+    print(f"期待値 {len(golden)} 件（追加 {len(added)} 件）：{GOLDEN_PATH}")
+
+
+def check_golden() -> int:
+    golden = load_golden()
+    convert_math.cache_clear()
+    bad = [(x, want, auto_math_to_latex(x)) for x, want in golden.items() if auto_math_to_latex(x) != want]
+    got = math_to_latex_series(pd.Series(list(golden), dtype=object)).astype(object)
+    bad_series = int((pd.Series(list(golden.values()), dtype=object).values != got.values).sum())
+    print(f"照合 期待値 {len(golden):>7} 件：不一致 {len(bad)} 件（列版 {bad_series} 件）")
+    for x, want, have in bad[:5]:
+        print(f"  {x!r}\n    期待 {want!r}\n    新   {have!r}")
+    return len(bad) + bad_series
+
+
+def fuzz_cells(n: int) -> list:
+    rng = random.Random(0)
+    return ["".join(rng.choice(TOKENS) for _ in range(rng.randint(1, 12))) for _ in range(n)]
+
+
+def check(label: str, cells: list) -> int:
+    convert_math.cache_clear()
+    bad = [(x, legacy(x), auto_math_to_latex(x)) for x in cells if legacy(x) != auto_math_to_latex(x)]
+    expected = pd.Series([legacy(safe_str(x)) for x in cells], dtype=object)
+    got = math_to_latex_series(pd.Series(cells, dtype=object)).astype(object)
+    bad_series = int((expected.values != got.values).sum())
+    print(f"照合 {label:<6} {len(cells):>7} 件：不一致 {len(bad)} 件（列版 {bad_series} 件）")
+    for x, want, have in bad[:5]:
+        print(f"  {x!r}\n    従来 {want!r}\n    新   {have!r}")
+    return len(bad) + bad_series
+
+
+def throughput(label: str, fn, cells: list) -> None:
+    t0 = time.perf_counter()
+    for x in cells:
+        fn(x)
+    sec = time.perf_counter() - t0
+    print(f"{label:<10} {len(cells) / sec / 1e3:9.1f} 千件/秒")
+
+
+def main() -> int:
+    if "--save-golden" in sys.argv[1:]:
+        save_golden()
+        return 0
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    cells = bank_cells()
+    errors = check("問題", cells) + check("ランダム", fuzz_cells(n)) + check_golden()
+
+    # 変換対象になる文字列（safe_str 済み）で比べる
+    strings = [safe_str(x) for x in cells if safe_str(x)]
+    strings = (strings * (200_000 // len(strings) + 1))[:200_000]
+    print(f"\n速度（{len(strings)} 件、異なる文字列 {len(set(strings))} 件）")
+    throughput("順に6回", apply_math_rules, strings)
+    single = convert_math.__wrapped__
+    throughput("1回の走査", single, strings)
+    convert_math.cache_clear()
+    throughput("LRU あり", convert_math, strings)
+    info = convert_math.cache_info()
+    print(f"  LRU：ヒット {info.hits} / ミス {info.misses}（上限 {info.maxsize}）")
+
+    col = pd.Series(strings)
+    for label, fn in (("列版 従来", legacy_series), ("列版 新", math_to_latex_series)):
+        convert_math.cache_clear()
+        t0 = time.perf_counter()
+        fn(col)
+        print(f"{label:<10} {(time.perf_counter() - t0) * 1e3:9.1f} ms")
+
+    if errors:
+        print(f"\n不一致が {errors} 件あります", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""
+数式の事前描画（MATH_PRERENDER）のベンチマーク
+
+  python benchmarks/bench_math_html.py
+
+問題ファイルの全問について
+  - $...$ の断片のうち、サーバー側で HTML にできた割合（残りはブラウザで KaTeX が組版する）
+  - 50問分（結果画面の最大）を事前描画する時間：初回（断片のキャッシュなし）/ 2回目以降
+  - ブラウザで組版が必要な断片の数：事前描画なし / あり
+を出す。ブラウザ側の組版時間そのものはここでは測らない（サーバーから送る断片の数で比べる）。
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from spi_core.compiler import Unit, load_questions  # noqa: E402
+from spi_core.mathhtml import MATH_FRAGMENT, prerender_question, render_tex  # noqa: E402
+from spi_core.store import QuestionStore  # noqa: E402
+
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "spi_questions_converted.csv")
+RESULT_SIZE = 50
+
+
+def fragments(q) -> list:
+    return [m.group(1) for text in (q.question, *q.choices, q.explanation) for m in MATH_FRAGMENT.finditer(text)]
+
+
+def main() -> None:
+    df, _, _ = load_questions(Unit(CSV_PATH, None), "images")
+    store = QuestionStore.from_frame(df)
+    questions = list(store.questions)
+
+    frags = [f for q in questions for f in fragments(q)]
+    rendered = sum(render_tex(f) is not None for f in frags)
+    print(f"数式の断片：{len(frags)} 件（異なる断片 {len(set(frags))} 件）、HTML にできたもの {rendered} 件"
+          f"（{rendered / max(1, len(frags)):.0%}）")
+
+    # 数式を含む問題を優先して結果画面1回分を作る
+    page = sorted(questions, key=lambda q: -len(fragments(q)))[:RESULT_SIZE]
+    render_tex.cache_clear()
+    prerender_question.cache_clear()
+    t0 = time.perf_counter()
+    done = [prerender_question(q) for q in page]
+    cold = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    [prerender_question(q) for q in page]
+    warm = time.perf_counter() - t0
+    print(f"{len(page)} 問の事前描画：初回 {cold * 1e3:.2f} ms / 2回目以降 {warm * 1e6:.1f} µs")
+
+    before = sum(len(fragments(q)) for q in page)
+    after = sum(len(fragments(q)) for q in done)
+    print(f"ブラウザで組版する断片：事前描画なし {before} 件 → あり {after} 件")
+
+
+if __name__ == "__main__":
+    main()
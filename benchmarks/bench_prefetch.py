@@ -0,0 +1,70 @@
+"""
+次の問題の先読みのベンチマーク
+
+  python benchmarks/bench_prefetch.py [問題数] [幅px] [1問あたりの思考時間（秒）]
+
+大きめの PNG を持つ問題を順に表示し、「次へ」を押してから画像が用意できるまでの時間
+（問題間の待ち時間）を、先読みなし / あり（表示中に次の1問を prefetch）で比べる。
+キャッシュ上限を小さくして、全体の事前準備では用意されない状況を作る。
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from spi_core.assets import ImageAssets  # noqa: E402
+from spi_core.store import QuestionStore  # noqa: E402
+
+
+def run(images_dir: str, store: QuestionStore, think: float, prefetch: bool) -> np.ndarray:
+    assets = ImageAssets(images_dir, max_bytes=1)  # 事前準備は1枚目だけ
+    assets.prepare(store)
+    time.sleep(think)
+    waits = []
+    for i in range(len(store)):
+        t0 = time.perf_counter()
+        assets.data(assets.ref(store.question(i)))
+        waits.append(time.perf_counter() - t0)
+        if prefetch and i + 1 < len(store):
+            assets.prefetch([store.question(i + 1)])
+        time.sleep(think)  # 問題を読んで解いている時間
+    return np.array(waits[1:])
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 2400
+    think = float(sys.argv[3]) if len(sys.argv) > 3 else 1.5
+    from PIL import Image
+
+    work = tempfile.mkdtemp(prefix="spi-prefetch-")
+    try:
+        images_dir = os.path.join(work, "images")
+        os.makedirs(images_dir)
+        rng = np.random.default_rng(0)
+        names = []
+        for i in range(count):
+            pixels = rng.integers(0, 32, (width * 2 // 3, width, 3), dtype=np.uint8) + 180
+            names.append(f"q{i}.png")
+            Image.fromarray(pixels).save(os.path.join(images_dir, names[-1]))
+        store = QuestionStore(np.arange(count), {
+            "question": [f"q{i}" for i in range(count)],
+            "answer": [0] * count,
+            "category": ["非言語"] * count,
+            "image": names,
+        })
+
+        for label, prefetch in (("先読みなし", False), ("先読みあり", True)):
+            waits = run(images_dir, store, think, prefetch)
+            print(f"{label}  問題間の待ち時間 平均 {waits.mean() * 1e3:8.2f} ms  最大 {waits.max() * 1e3:8.2f} ms")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+描画時のフィールド参照のベンチマーク
+
+  python benchmarks/bench_question_record.py
+
+1問の描画で参照するフィールド（問題文・選択肢5つ・正解・解説・画像・カテゴリー）を
+  - pd.Series：questions.iloc[idx] から q.get(...) で約10回
+  - dict    ：QuestionStore.row(qid)（列から毎回 dict を組み立てる）
+  - Question：QuestionStore.question(qid)（読込時に作ったレコードの属性）
+で比べる。あわせてレコード作成（バンク読込時に1回）の時間も出す。
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from spi_core.compiler import Unit, load_questions  # noqa: E402
+from spi_core.question import build_questions  # noqa: E402
+from spi_core.store import QuestionStore  # noqa: E402
+
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "spi_questions_converted.csv")
+REPEAT = 20
+
+
+def render_series(df, idx):
+    q = df.iloc[idx]
+    return (q.get("question_md"), [q.get(f"choice{i}_md") for i in range(1, 6)], q.get("answer"),
+            q.get("explanation_md"), q.get("image"), q.get("image_url"), q.get("category"))
+
+
+def render_dict(store, qid):
+    q = store.row(qid)
+    return (q["question_md"], [q[f"choice{i}_md"] for i in range(1, 6)], q["answer"],
+            q["explanation_md"], q.get("image"), q.get("image_url"), q["category"])
+
+
+def render_record(store, qid):
+    q = store.question(qid)
+    return q.question, q.choices, q.answer, q.explanation, q.image, q.category
+
+
+def bench(fn, keys) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        for k in keys:
+            fn(k)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(keys)
+
+
+def main() -> None:
+    df, _, _ = load_questions(Unit(CSV_PATH, None), "images")
+    store = QuestionStore.from_frame(df)
+    ids = store.ids.tolist()
+
+    rows = {
+        "pd.Series（iloc + get）": bench(lambda i: render_series(df, i), range(len(df))),
+        "dict（row）": bench(lambda q: render_dict(store, q), ids),
+        "Question（属性）": bench(lambda q: render_record(store, q), ids),
+    }
+    for label, sec in rows.items():
+        print(f"{label:<24} {sec * 1e6:8.2f} µs/描画")
+
+    columns = {name: store.column(name) for name in store.fields}
+    t0 = time.perf_counter()
+    build_questions(store.ids, columns, store.answer_index, store.time_limit)
+    print(f"レコード作成（読込時1回） {(time.perf_counter() - t0) * 1e3:.2f} ms / {len(store)} 問")
+
+
+if __name__ == "__main__":
+    main()
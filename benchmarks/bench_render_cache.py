@@ -0,0 +1,73 @@
+"""
+*_md 列の前計算の効果を測るベンチマーク
+
+  python benchmarks/bench_render_cache.py
+
+再実行1回あたりに描画関数が行う文字列処理を
+  before: auto_math_to_latex(safe_str(q.get(...))) を毎回実行
+  after : 読込時に作った *_md 列を参照するだけ
+で比較する。
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from spi_core.display import DISPLAY_FIELDS, add_display_columns, auto_math_to_latex, safe_str  # noqa: E402
+
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "spi_questions_converted.csv")
+RESULT_SIZE = 50
+REPEAT = 200
+
+
+def page_fields(ci: int, ui: int) -> list:
+    """その都度採点の1問分（問題・選択肢5つ・正解/自分の回答・解説）で参照する列"""
+    return ["question"] + [f"choice{i}" for i in range(1, 6)] + [f"choice{ci}", f"choice{ui}", "explanation"]
+
+
+def rerun_before(rows: list) -> None:
+    for q in rows:
+        for c in page_fields(2, 4):
+            auto_math_to_latex(safe_str(q.get(c, "")))
+
+
+def rerun_after(rows: list) -> None:
+    for q in rows:
+        for c in page_fields(2, 4):
+            q[f"{c}_md"]
+
+
+def timeit(fn, rows: list) -> float:
+    t0 = time.perf_counter()
+    for _ in range(REPEAT):
+        fn(rows)
+    return (time.perf_counter() - t0) / REPEAT
+
+
+def main() -> None:
+    df = pd.read_csv(CSV_PATH, dtype=str, keep_default_na=False, na_filter=False, encoding="utf-8")
+    df.columns = df.columns.str.strip().str.lower()
+    df = df[df["question"] != ""].copy()
+
+    t0 = time.perf_counter()
+    add_display_columns(df)
+    build = time.perf_counter() - t0
+    print(f"add_display_columns: {build * 1000:.2f} ms（{len(df)} 行 x {len(DISPLAY_FIELDS)} 列、読込時に1回）")
+
+    sample = df.sample(n=RESULT_SIZE, replace=len(df) < RESULT_SIZE, random_state=0)
+    pages = {
+        "quiz/explanation（1問）": [sample.iloc[0]],
+        f"result（{RESULT_SIZE}問）": [sample.iloc[i] for i in range(RESULT_SIZE)],
+    }
+    print(f"{'page':<24}{'before':>12}{'after':>12}{'speedup':>10}")
+    for name, rows in pages.items():
+        before = timeit(rerun_before, rows)
+        after = timeit(rerun_after, rows)
+        print(f"{name:<24}{before * 1e6:>10.1f}us{after * 1e6:>10.1f}us{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+再実行回数と1問あたりの時間のベンチマーク（実際のサーバーを起動して WebSocket で操作する）
+
+  python benchmarks/bench_reruns.py [スクリプト] [問題数]
+
+streamlit run をヘッドレスで起動し、ブラウザと同じ BackMsg（rerun_script）を送って
+「その都度採点」で N 問を解く。1問（選択 → 回答する → 次の問題へ）ごとに
+  - サーバー側の再実行回数（アプリ全体 / フラグメントだけ）
+  - 操作を送ってから再実行が終わるまでの時間の合計
+を数える。AppTest はフラグメント単位の再実行をしないので、ここでは実サーバーを使う。
+サーバーの回答ログ・進行状況は一時フォルダ（SPI_DATA_DIR）に書かせる（本番のログ・集計を汚さない）。
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import numpy as np
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from websockets.asyncio.client import connect
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+DONE = (ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(script: str, port: int, data_dir: str) -> subprocess.Popen:
+    """streamlit run を起動して応答するまで待つ（回答ログ・進行状況は data_dir に書かせる）"""
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", script, "--server.headless", "true",
+         "--server.port", str(port), "--server.fileWatcherType", "none",
+         "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        env=dict(os.environ, SPI_DATA_DIR=data_dir),
+    )
+    for _ in range(300):
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as res:
+                if res.status == 200:
+                    return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("サーバーが起動しませんでした")
+
+
+class Browser:
+    """ブラウザの代わり：ウィジェットの状態を覚えておき、操作ごとに rerun_script を送る"""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.widgets = {}   # ラベル → (種類, proto, fragment_id)
+        self.states = {}    # ウィジェットID → WidgetState（ブラウザと同じく毎回すべて送る）
+        self.page_hash = ""
+        self.full_runs = 0
+        self.fragment_runs = 0
+
+    async def rerun(self, trigger: WidgetState = None, fragment_id: str = "") -> float:
+        msg = BackMsg()
+        msg.rerun_script.page_script_hash = self.page_hash
+        msg.rerun_script.fragment_id = fragment_id
+        widgets = msg.rerun_script.widget_states.widgets
+        widgets.extend(self.states.values())
+        if trigger is not None:
+            widgets.append(trigger)
+        t0 = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        while True:
+            data = await self.ws.recv()
+            fwd = ForwardMsg.FromString(data)
+            kind = fwd.WhichOneof("type")
+            if kind == "new_session":
+                self.page_hash = fwd.new_session.page_script_hash
+                if fwd.new_session.fragment_ids_this_run:
+                    self.fragment_runs += 1
+                else:
+                    self.full_runs += 1
+            elif kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                el = fwd.delta.new_element
+                wtype = el.WhichOneof("type")
+                if wtype in ("radio", "button", "number_input"):
+                    proto = getattr(el, wtype)
+                    self.widgets[proto.label] = (wtype, proto, fwd.delta.fragment_id)
+            elif kind == "script_finished" and fwd.script_finished in DONE:
+                return time.perf_counter() - t0
+
+    async def choose(self, label: str, value) -> float:
+        """radio / number_input の値を変える（フォーム内なら送信まで再実行しない）"""
+        wtype, proto, fragment_id = self.widgets[label]
+        state = WidgetState(id=proto.id)
+        if wtype == "radio":
+            state.string_value = value
+        else:
+            state.int_value = int(value)
+        self.states[proto.id] = state
+        if proto.form_id:
+            return 0.0
+        return await self.rerun(fragment_id=fragment_id)
+
+    async def click(self, label: str) -> float:
+        _, proto, fragment_id = self.widgets[label]
+        return await self.rerun(WidgetState(id=proto.id, trigger_value=True), fragment_id)
+
+
+async def solve(port: int, n: int) -> None:
+    async with connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"], max_size=None) as ws:
+        await run_session(Browser(ws), n)
+
+
+async def run_session(b: Browser, n: int) -> None:
+    await b.rerun()
+    await b.choose("出題カテゴリー：", "言語")
+    await b.choose("出題数（1〜50）", n)
+    await b.click("開始")
+
+    runs, seconds = [], []
+    for _ in range(n):
+        full, frag = b.full_runs, b.fragment_runs
+        t = await b.choose("回答を選んでください：", "B")
+        t += await b.click("回答する")
+        t += await b.click("次の問題へ")
+        runs.append((b.full_runs - full, b.fragment_runs - frag))
+        seconds.append(t)
+    runs = np.array(runs)
+    seconds = np.array(seconds[:-1])  # 最後の1問は結果画面への切り替えを含むので除く
+    print(f"1問あたりの再実行：全体 {runs[:-1, 0].mean():.1f} 回 / フラグメント {runs[:-1, 1].mean():.1f} 回")
+    print(f"1問あたりの時間  ：平均 {seconds.mean() * 1e3:.1f} ms / 中央値 {np.median(seconds) * 1e3:.1f} ms")
+
+
+def main() -> None:
+    script = sys.argv[1] if len(sys.argv) > 1 else "spi_app_20q.py"
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    port = free_port()
+    with tempfile.TemporaryDirectory(prefix="spi-bench-data-") as data_dir:
+        proc = start_server(script, port, data_dir)
+        try:
+            asyncio.run(solve(port, n))
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+カテゴリ索引とサンプラーのベンチマーク
+
+  python benchmarks/bench_sampler.py [行数] [カテゴリ数]
+
+  before: df[df["category"] == cat].sample(n)（開始ボタンのたびに全行を比較）
+  after : 読込時に作った索引から sample_ids / sample_mock_exam
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from spi_core.sampler import build_category_index, sample_ids, sample_mock_exam  # noqa: E402
+
+N_QUESTIONS = 50
+REPEAT = 200
+
+
+def per_call(fn) -> float:
+    t0 = time.perf_counter()
+    for _ in range(REPEAT):
+        fn()
+    return (time.perf_counter() - t0) / REPEAT
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    n_cats = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+
+    names = np.array([f"cat{i:02d}" for i in range(n_cats)], dtype=object)
+    df = pd.DataFrame({"category": names[np.random.default_rng(0).integers(0, n_cats, rows)]})
+    cat = names[0]
+    ratio = {names[0]: 2, names[1]: 1}
+
+    t0 = time.perf_counter()
+    index = build_category_index(df.index.to_numpy(), df["category"].to_numpy())
+    build = time.perf_counter() - t0
+
+    before = per_call(lambda: df[df["category"] == cat].sample(n=N_QUESTIONS))
+    after = per_call(lambda: sample_ids(index, cat, N_QUESTIONS))
+    mock = per_call(lambda: sample_mock_exam(index, ratio, N_QUESTIONS))
+
+    print(f"{rows:,} 行 / {n_cats} カテゴリ / {N_QUESTIONS} 問抽出")
+    print(f"  build_category_index（読込時に1回）: {build * 1000:.1f} ms")
+    print(f"  before 絞り込み + sample          : {before * 1e6:,.1f} us")
+    print(f"  after  sample_ids                 : {after * 1e6:,.1f} us")
+    print(f"  after  sample_mock_exam（2カテゴリ）: {mock * 1e6:,.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+採点エンジンのベンチマーク
+
+  python benchmarks/bench_scoring.py [セッション数] [出題数]
+
+  before: answers[i] == normalize_answer_letter(q.get("answer")) を1問ずつ比較するループ
+  after : score_session（1セッション）/ tally（保存済みの全セッションを一括）
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from spi_core.compiler import build_bank  # noqa: E402
+from spi_core.scoring import ANSWER_LABELS, ANSWER_LETTERS, NO_ANSWER, score_session, tally  # noqa: E402
+from spi_core.store import QuestionStore  # noqa: E402
+
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "spi_questions_converted.csv")
+
+
+# 従来の CSV は正解を "A" などの文字で持っていた（-1 は末尾の空文字）
+CSV_ANSWERS = ANSWER_LABELS + [""]
+
+
+def score_loop(store, ids, letters) -> int:
+    score = 0
+    for qid, user in zip(ids, letters):
+        q = store.row(qid)
+        if user == CSV_ANSWERS[q["answer"]].strip().lower():
+            score += 1
+    return score
+
+
+def main() -> None:
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    # バンクファイルは書き出さず、メモリ上で作る
+    _, payload, _ = build_bank([CSV_PATH], os.path.join(os.path.dirname(CSV_PATH), "bench.bank"))
+    store = QuestionStore(payload["ids"], payload["columns"])
+
+    rng = np.random.default_rng(0)
+    ids = np.stack([rng.choice(store.ids, size=n, replace=False) for _ in range(sessions)]).astype(np.int32)
+    answers = rng.integers(-1, 5, size=(sessions, n)).astype(np.int8)
+    start = np.zeros((sessions, n))
+    end = rng.uniform(3, 60, size=(sessions, n))
+    letters = [[ANSWER_LETTERS[a] if a != NO_ANSWER else None for a in row] for row in answers]
+
+    t0 = time.perf_counter()
+    loop_scores = [score_loop(store, ids[i], letters[i]) for i in range(sessions)]
+    loop_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    session_scores = [score_session(store, ids[i], answers[i], start[i], end[i]).total for i in range(sessions)]
+    session_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    t = tally(store, np.repeat(np.arange(sessions), n), ids.ravel(), answers.ravel(), (end - start).ravel(), sessions)
+    batch_s = time.perf_counter() - t0
+
+    assert loop_scores == session_scores == t.attempt_total.tolist()
+
+    # ストアに無い問題ID（削除した問題・旧形式の負のID）への回答は数えずに unknown に出る
+    absent = np.array([-1 - ids[0, 0], next(q for q in range(1, len(store) + 2) if q not in store)], dtype=np.int32)
+    u = tally(store, np.concatenate([np.repeat(np.arange(sessions), n), [0, 0]]),
+              np.concatenate([ids.ravel(), absent]), np.concatenate([answers.ravel(), [0, 0]]),
+              np.concatenate([(end - start).ravel(), [1.0, 1.0]]), sessions)
+    assert u.unknown == 2 and t.unknown == 0
+    assert all(np.array_equal(a, b) for a, b in zip(u[:-1], t[:-1]))
+    print(f"{sessions:,} セッション x {n} 問")
+    print(f"  before ループ採点          : {loop_s / sessions * 1e6:8.1f} us/session")
+    print(f"  after  score_session       : {session_s / sessions * 1e6:8.1f} us/session")
+    print(f"  after  tally（一括）       : {batch_s * 1000:8.1f} ms 合計（{batch_s / sessions * 1e6:.2f} us/session）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+セッションあたりのメモリ量を測るベンチマーク
+
+  python benchmarks/bench_session_footprint.py [セッション数] [出題数]
+
+開始ボタンでセッションに入れるクイズ状態を N セッション分作り、tracemalloc で測る。
+  before: pool.sample(n).reset_index(drop=True) の DataFrame + answers/start_times/deadlines
+  after : int32 の問題ID配列 + int8 の answers + float の時刻配列（本文は load_questions で作った共有ストア）
+"""
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from spi_core.compiler import Unit, load_questions  # noqa: E402
+from spi_core.display import add_display_columns  # noqa: E402
+from spi_core.store import QuestionStore  # noqa: E402
+
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "spi_questions_converted.csv")
+
+
+def load_frame() -> pd.DataFrame:
+    """before 用：従来のアプリが読んでいた形（全列が文字列）"""
+    df = pd.read_csv(CSV_PATH, dtype=str, keep_default_na=False, na_filter=False, encoding="utf-8")
+    df.columns = df.columns.str.strip().str.lower()
+    df = df[df["question"] != ""].copy()
+    return add_display_columns(df)
+
+
+def session_before(pool: pd.DataFrame, n: int) -> dict:
+    return {
+        "questions": pool.sample(n=n).reset_index(drop=True),
+        "answers": [None] * n,
+        "start_times": [None] * n,
+        "deadlines": [None] * n,
+    }
+
+
+def session_after(pool: np.ndarray, n: int) -> dict:
+    return {
+        "question_ids": np.random.choice(pool, size=n, replace=False).astype(np.int32),
+        "answers": np.full(n, -1, dtype=np.int8),
+        "start_times": np.full(n, np.nan),
+        "deadlines": np.full(n, np.nan),
+        "end_times": np.full(n, np.nan),
+    }
+
+
+def measure(make, pool, sessions: int, n: int) -> float:
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    kept = [make(pool, n) for _ in range(sessions)]
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del kept
+    return used / sessions
+
+
+def main() -> None:
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    df = load_frame()
+    # ストアはコンパイラと同じ変換（正解は int8、制限時間は数値）を通した DataFrame から作る
+    compiled, _, _ = load_questions(Unit(CSV_PATH, None), os.path.join(os.path.dirname(CSV_PATH), "images"))
+    store = QuestionStore.from_frame(compiled)
+    cat = "言語"
+
+    before = measure(session_before, df[df["category"] == cat], sessions, n)
+    after = measure(session_after, store.by_category[cat], sessions, n)
+
+    print(f"{sessions} セッション x {n} 問")
+    print(f"  before（DataFrame コピー）: {before:,.0f} bytes/session")
+    print(f"  after （int32 ID 配列）   : {after:,.0f} bytes/session")
+    print(f"  内訳：question_ids {sys.getsizeof(np.zeros(n, np.int32))} bytes"
+          f" + answers {sys.getsizeof(np.zeros(n, np.int8))} bytes"
+          f" + start_times/deadlines/end_times 各 {sys.getsizeof(np.zeros(n))} bytes")
+
+
+if __name__ == "__main__":
+    main()
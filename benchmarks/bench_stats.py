@@ -0,0 +1,73 @@
+"""
+集計テーブルのベンチマーク
+
+  python benchmarks/bench_stats.py [回答件数]
+
+回答件数を増やしながら、
+  - 管理画面の読み出し（集計テーブルだけ）
+  - 比較用：回答ログ全体を GROUP BY した場合
+の所要時間を測る。集計テーブルの読み出しは回答件数によらずほぼ一定になる。
+"""
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from spi_core.attempt_log import AttemptLog  # noqa: E402
+from spi_core.stats import read_stats  # noqa: E402
+
+QUESTIONS = 300
+
+
+def best_of(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    work = tempfile.mkdtemp(prefix="spi-stats-")
+    db_path = os.path.join(work, "attempts.sqlite3")
+    rng = np.random.default_rng(0)
+    try:
+        log = AttemptLog(db_path, batch_size=5_000)
+        written = 0
+        print(f"{'回答件数':>10} {'集計テーブル':>14} {'ログを GROUP BY':>16}")
+        step = max(total // 4, 1)
+        while written < total:
+            n = min(step, total - written)
+            qids = rng.integers(0, QUESTIONS, n)
+            choices = rng.integers(-1, 5, n)
+            elapsed = rng.exponential(20.0, n)
+            for q, c, e in zip(qids.tolist(), choices.tolist(), elapsed.tolist()):
+                log.record("bench", q, c, c == 0, e, "言語" if q % 2 else "非言語")
+            log.flush()
+            written += n
+
+            t_stats = best_of(lambda: read_stats(db_path, "question_stats"))
+
+            def scan():
+                conn = sqlite3.connect(db_path)
+                conn.execute("SELECT question_id, COUNT(*), SUM(correct), TOTAL(elapsed) "
+                             "FROM attempts GROUP BY question_id").fetchall()
+                conn.close()
+
+            t_scan = best_of(scan, repeat=3)
+            print(f"{written:>10,} {t_stats * 1e3:>11.2f} ms {t_scan * 1e3:>13.2f} ms")
+        log.close()
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
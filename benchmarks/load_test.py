@@ -0,0 +1,198 @@
+"""
+負荷試験：ローカルに起動したサーバーへ N 人分のセッションを同時につなぎ、
+select → quiz → explanation → result を最後まで解かせる。
+
+  python benchmarks/load_test.py -u 100 -q 10 --think 2
+
+操作は bench_reruns.py と同じく、ブラウザと同じ BackMsg を WebSocket で送る（AppTest はサーバーを通らない）。
+各ユーザーは操作のあいだに think 秒（平均、0.5〜1.5 倍でばらつかせる）待ち、開始は ramp 秒に分散する。
+出すもの：
+  - 再実行の待ち時間（操作を送ってから再実行が終わるまで）の p50 / p95 / p99（全体と操作別）
+  - サーバープロセスの CPU 使用率（平均・最大、1コア = 100%）と RSS（開始前・最大、1セッションあたり）
+  - スループット（再実行/秒、回答/秒、完了セッション/分）
+クライアントも同じマシンで動くので、CPU の数字はサーバープロセスだけを見る。
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+
+import numpy as np
+from websockets.asyncio.client import connect
+
+from bench_reruns import Browser, free_port, start_server
+
+try:
+    import psutil
+except ImportError:  # psutil が無ければ /proc を読む（Linux のみ）
+    psutil = None
+
+MODES = ["その都度採点", "最後にまとめて採点"]
+ANSWER_CHOICES = ["A", "B", "C", "D", "E"]
+SAMPLE_INTERVAL = 0.5
+RERUN_TIMEOUT = 120.0
+
+
+class ProcessMonitor:
+    """サーバープロセスの CPU 時間と RSS を一定間隔で読む"""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.proc = psutil.Process(pid) if psutil else None
+        self.cpu_samples = []
+        self.rss_samples = []
+
+    def cpu_seconds(self) -> float:
+        if self.proc:
+            t = self.proc.cpu_times()
+            return t.user + t.system
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+    def rss(self) -> int:
+        if self.proc:
+            return self.proc.memory_info().rss
+        with open(f"/proc/{self.pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+        return 0
+
+    async def run(self, stop: asyncio.Event) -> None:
+        last_cpu, last_t = self.cpu_seconds(), time.perf_counter()
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), SAMPLE_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            cpu, t = self.cpu_seconds(), time.perf_counter()
+            self.cpu_samples.append((cpu - last_cpu) / (t - last_t))
+            self.rss_samples.append(self.rss())
+            last_cpu, last_t = cpu, t
+
+
+class Recorder:
+    """操作ごとの再実行の待ち時間を集める"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.completed = 0
+        self.answered = 0
+        self.errors = []
+
+    def add(self, action: str, seconds: float) -> None:
+        self.latencies[action].append(seconds)
+
+
+async def user(port: int, args, rng: random.Random, rec: Recorder, delay: float) -> None:
+    await asyncio.sleep(delay)
+
+    async def think() -> None:
+        if args.think > 0:
+            await asyncio.sleep(args.think * rng.uniform(0.5, 1.5))
+
+    async def step(action: str, coro) -> None:
+        rec.add(action, await asyncio.wait_for(coro, RERUN_TIMEOUT))
+
+    try:
+        async with connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"],
+                           max_size=None) as ws:
+            b = Browser(ws)
+            await step("表示", b.rerun())
+            await think()
+            await step("設定", b.choose("出題カテゴリー：", args.category))
+            await step("設定", b.choose("出題数（1〜50）", args.questions))
+            await step("設定", b.choose("採点方法：", args.mode))
+            await step("設定", b.choose("制限時間（1問あたり秒、問題に設定が無い場合）", args.time_limit))
+            await step("開始", b.click("開始"))
+            for _ in range(args.questions):
+                await think()
+                await b.choose("回答を選んでください：", rng.choice(ANSWER_CHOICES))  # フォーム内：送信まで再実行しない
+                await step("回答", b.click("回答する"))
+                rec.answered += 1
+                if args.mode == MODES[0]:
+                    await think()
+                    await step("次へ", b.click("次の問題へ"))
+            rec.completed += 1
+    except Exception as e:  # 1人の失敗で全体を止めない
+        rec.errors.append(f"{type(e).__name__}: {e}")
+
+
+def percentiles(values: list) -> str:
+    p50, p95, p99 = np.percentile(np.asarray(values) * 1e3, [50, 95, 99])
+    return f"p50 {p50:8.1f}  p95 {p95:8.1f}  p99 {p99:8.1f} ms  （{len(values)} 回）"
+
+
+async def run(port: int, pid: int, args) -> None:
+    # 1人分を先に通して、バンク読込などの初回コストを計測から外す
+    warm = Recorder()
+    warm_args = argparse.Namespace(**{**vars(args), "think": 0.0})
+    await user(port, warm_args, random.Random(-1), warm, 0.0)
+    if warm.errors:
+        raise RuntimeError(f"ウォームアップに失敗しました：{warm.errors[0]}")
+
+    monitor = ProcessMonitor(pid)
+    base_rss = monitor.rss()
+    rec = Recorder()
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(monitor.run(stop))
+    t0 = time.perf_counter()
+    await asyncio.gather(*(
+        user(port, args, random.Random(args.seed + i), rec, args.ramp * i / max(1, args.users))
+        for i in range(args.users)
+    ))
+    wall = time.perf_counter() - t0
+    stop.set()
+    await sampler
+
+    total = [s for values in rec.latencies.values() for s in values]
+    print(f"ユーザー {args.users} 人 × {args.questions} 問（{args.mode}、考える時間 平均 {args.think} 秒、"
+          f"開始を {args.ramp} 秒に分散）")
+    print(f"完了 {rec.completed} / 失敗 {len(rec.errors)}、経過 {wall:.1f} 秒")
+    for err in rec.errors[:5]:
+        print(f"  {err}")
+    if not total:
+        return
+    print(f"\n再実行の待ち時間\n  {'全体':<4} {percentiles(total)}")
+    for action, values in rec.latencies.items():
+        print(f"  {action:<4} {percentiles(values)}")
+
+    cpu = np.asarray(monitor.cpu_samples or [0.0]) * 100
+    peak_rss = max(monitor.rss_samples or [base_rss])
+    print(f"\nサーバー CPU  平均 {cpu.mean():.0f}%  最大 {cpu.max():.0f}%（1コア = 100%）")
+    print(f"サーバー RSS  開始前 {base_rss / 2**20:.0f} MiB → 最大 {peak_rss / 2**20:.0f} MiB"
+          f"（1セッションあたり {(peak_rss - base_rss) / max(1, args.users) / 2**10:.0f} KiB）")
+    print(f"スループット  再実行 {len(total) / wall:.1f} 回/秒  回答 {rec.answered / wall:.1f} 問/秒  "
+          f"完了 {rec.completed / wall * 60:.1f} セッション/分")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="同時セッションの負荷試験（ローカルにサーバーを起動して WebSocket で操作）")
+    parser.add_argument("script", nargs="?", default="spi_app_20q.py", help="起動するアプリ")
+    parser.add_argument("-u", "--users", type=int, default=50, help="同時ユーザー数")
+    parser.add_argument("-q", "--questions", type=int, default=10, help="1人あたりの出題数")
+    parser.add_argument("--mode", choices=MODES, default=MODES[0], help="採点方法")
+    parser.add_argument("--category", default="言語", help="出題カテゴリー")
+    parser.add_argument("--think", type=float, default=1.0, help="操作のあいだの考える時間（秒、平均）")
+    parser.add_argument("--ramp", type=float, default=5.0, help="全員が開始するまでの秒数")
+    parser.add_argument("--time-limit", type=int, default=600, help="1問あたりの制限時間（秒、問題に設定が無い場合）")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    port = free_port()
+    # 回答ログ・進行状況は一時フォルダへ（試験の回答を本番の集計に混ぜない）
+    with tempfile.TemporaryDirectory(prefix="spi-load-data-") as data_dir:
+        proc = start_server(args.script, port, data_dir)
+        try:
+            asyncio.run(run(port, proc.pid, args))
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+"""
+マイクロベンチマーク一式（基準値と比べて、遅くなっていれば終了コード 1）
+
+  python benchmarks/suite.py              # 計測して baseline.json と比べる
+  python benchmarks/suite.py --save       # 計測結果を基準値として保存する
+  python benchmarks/suite.py -k render    # 名前に render を含むものだけ
+
+対象：load_questions（実際の CSV / 合成した 1万・10万行）、auto_math_to_latex（全問題の全文字列）、
+AppTest での描画（問題・解説・結果画面の再実行）、出題の抽選、採点、画像の解決と参照。
+各項目は timeit の autorange で回数を決め、REPEAT 回のうち最速の値（1回あたり。ほかの処理の割り込みに
+左右されにくい）を基準値と比べる。中央値も表示する。
+許容を超えた項目は RETRIES 回まで測り直し、すべて超えたときだけ失敗にする。基準値が FAST_CASE 未満の
+項目は揺れが大きいので、許容を FAST_TOLERANCE まで広げる。--save では SAVE_ROUNDS 回測った最速値の中央値を
+保存する（たまたま速かった1回を基準値にしない）。
+基準値は計測したマシンに依存するので、比べるマシンで --save し直してから使う。
+描画の項目は実際のアプリを動かすので、回答ログ・進行状況は一時フォルダ（SPI_DATA_DIR）に書かせる。
+"""
+import argparse
+import atexit
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from spi_core.assets import ImageAssets  # noqa: E402
+from spi_core.compiler import Unit, load_questions, read_unit  # noqa: E402
+from spi_core.display import DISPLAY_FIELDS, auto_math_to_latex, convert_math  # noqa: E402
+from spi_core.sampler import sample_ids, sample_mock_exam  # noqa: E402
+from spi_core.scoring import score_session, tally  # noqa: E402
+from spi_core.store import QuestionStore  # noqa: E402
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CSV_PATH = os.path.join(ROOT, "spi_questions_converted.csv")
+APP_PATH = os.path.join(ROOT, "spi_app_20q.py")
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+REPEAT = 5
+MIN_SECONDS = 0.2
+TOLERANCE = 0.3  # 基準値より 30% 以上遅ければ失敗
+RETRIES = 3
+SAVE_ROUNDS = 3
+FAST_CASE = 100e-6  # 秒
+FAST_TOLERANCE = 1.0
+N_QUESTIONS = 20
+
+CASES = {}
+
+
+def case(name: str):
+    """ベンチマークを登録する（関数は準備をして、計測する引数なしの関数を返す）"""
+    def register(fn):
+        CASES[name] = fn
+        return fn
+    return register
+
+
+class Context:
+    """各ベンチマークで共有する準備（一時フォルダ・ストアなど、最初に使うときに作る）"""
+
+    def __init__(self):
+        self.work = tempfile.mkdtemp(prefix="spi-suite-")
+        self._store = None
+        # アプリの回答ログ・進行状況の書き込み先（アプリの import 前に決める）。
+        # 回答ログはプロセス終了時に書き込みを終えるので、消すのはその後（atexit は登録の逆順）
+        data_dir = tempfile.mkdtemp(prefix="spi-suite-data-")
+        atexit.register(shutil.rmtree, data_dir, True)
+        os.environ["SPI_DATA_DIR"] = data_dir
+
+    @property
+    def store(self) -> QuestionStore:
+        if self._store is None:
+            df, _, _ = load_questions(Unit(CSV_PATH, None), os.path.join(ROOT, "images"))
+            self._store = QuestionStore.from_frame(df)
+        return self._store
+
+    def synthetic_csv(self, rows: int) -> str:
+        """実際の CSV の行を繰り返して rows 行にした CSV（重複として除外されないよう問題文に行番号を足す）"""
+        path = os.path.join(self.work, f"synthetic_{rows}.csv")
+        if not os.path.exists(path):
+            base = read_unit(Unit(CSV_PATH, None))
+            df = pd.concat([base] * (rows // len(base) + 1), ignore_index=True).iloc[:rows]
+            df["question"] = df["question"] + "（" + df.index.astype(str) + "）"
+            df.to_csv(path, index=False)
+        return path
+
+    def close(self) -> None:
+        shutil.rmtree(self.work, ignore_errors=True)
+
+
+# =========================
+# 読込
+# =========================
+@case("load_questions/csv")
+def bench_load_csv(ctx: Context):
+    return lambda: load_questions(Unit(CSV_PATH, None), ctx.work)
+
+
+@case("load_questions/10k")
+def bench_load_10k(ctx: Context):
+    path = ctx.synthetic_csv(10_000)
+    return lambda: load_questions(Unit(path, None), ctx.work)
+
+
+@case("load_questions/100k")
+def bench_load_100k(ctx: Context):
+    path = ctx.synthetic_csv(100_000)
+    return lambda: load_questions(Unit(path, None), ctx.work)
+
+
+# =========================
+# 数式変換
+# =========================
+def bank_strings() -> list:
+    df = read_unit(Unit(CSV_PATH, None))
+    return [x for c in DISPLAY_FIELDS if c in df.columns for x in df[c].tolist()]
+
+
+@case("math/all-strings-cold")
+def bench_math_cold(ctx: Context):
+    strings = bank_strings()
+
+    def run():
+        convert_math.cache_clear()
+        for s in strings:
+            auto_math_to_latex(s)
+    return run
+
+
+@case("math/all-strings-cached")
+def bench_math_cached(ctx: Context):
+    strings = bank_strings()
+    for s in strings:
+        auto_math_to_latex(s)
+    return lambda: [auto_math_to_latex(s) for s in strings]
+
+
+# =========================
+# 描画（AppTest で1回の再実行）
+# =========================
+def start_app(mode: str):
+    from streamlit import logger
+    from streamlit.testing.v1 import AppTest
+
+    logger.set_log_level("error")  # AppTest の警告で表が読みにくくならないように
+
+    at = AppTest.from_file(APP_PATH, default_timeout=60).run()
+    at.radio[0].set_value("言語")
+    at.radio[1].set_value(mode)
+    at.number_input[0].set_value(N_QUESTIONS)
+    at.number_input[1].set_value(600)
+    at.button[0].click().run()
+    if at.exception:
+        raise RuntimeError(at.exception)
+    return at
+
+
+def answer(at) -> None:
+    [r for r in at.radio if str(r.key).startswith("pick_")][0].set_value("B")
+    [b for b in at.button if b.label == "回答する"][0].click().run()
+
+
+@case("render/quiz")
+def bench_render_quiz(ctx: Context):
+    return start_app("その都度採点").run
+
+
+@case("render/explanation")
+def bench_render_explanation(ctx: Context):
+    at = start_app("その都度採点")
+    answer(at)
+    return at.run
+
+
+@case("render/result")
+def bench_render_result(ctx: Context):
+    at = start_app("最後にまとめて採点")
+    for _ in range(N_QUESTIONS):
+        answer(at)
+    if at.session_state["page"] != "result":
+        raise RuntimeError("結果画面に進めませんでした")
+    return at.run
+
+
+# =========================
+# 抽選・採点
+# =========================
+@case("sampling/category")
+def bench_sample_ids(ctx: Context):
+    index = ctx.store.by_category
+    return lambda: sample_ids(index, "言語", N_QUESTIONS)
+
+
+@case("sampling/mock-exam")
+def bench_sample_mock(ctx: Context):
+    index = ctx.store.by_category
+    return lambda: sample_mock_exam(index, {"言語": 1, "非言語": 1}, N_QUESTIONS)
+
+
+@case("scoring/session")
+def bench_score_session(ctx: Context):
+    store = ctx.store
+    rng = np.random.default_rng(0)
+    ids = rng.choice(store.ids, size=N_QUESTIONS, replace=False)
+    answers = rng.integers(-1, 5, size=N_QUESTIONS).astype(np.int8)
+    start, end = np.zeros(N_QUESTIONS), rng.uniform(3, 60, size=N_QUESTIONS)
+    return lambda: score_session(store, ids, answers, start, end)
+
+
+@case("scoring/tally-10k")
+def bench_tally(ctx: Context):
+    store = ctx.store
+    sessions = 10_000
+    rng = np.random.default_rng(0)
+    ids = rng.choice(store.ids, size=sessions * N_QUESTIONS)
+    answers = rng.integers(-1, 5, size=ids.size).astype(np.int8)
+    elapsed = rng.uniform(3, 60, size=ids.size)
+    attempt = np.repeat(np.arange(sessions), N_QUESTIONS)
+    return lambda: tally(store, attempt, ids, answers, elapsed, sessions)
+
+
+# =========================
+# 画像
+# =========================
+def image_store(ctx: Context, count: int = 20, questions: int = 200) -> tuple:
+    from PIL import Image
+
+    images_dir = os.path.join(ctx.work, "images")
+    if not os.path.isdir(images_dir):
+        os.makedirs(images_dir)
+        rng = np.random.default_rng(0)
+        for i in range(count):
+            pixels = rng.integers(0, 32, (400, 1600, 3), dtype=np.uint8) + 180
+            Image.fromarray(pixels).save(os.path.join(images_dir, f"q{i}.png"))
+    store = QuestionStore(np.arange(questions), {
+        "question": [f"q{i}" for i in range(questions)],
+        "answer": [0] * questions,
+        "category": ["非言語"] * questions,
+        # 一部は存在しないファイル（警告表示の経路）
+        "image": [f"q{i % (count + 2)}.png" for i in range(questions)],
+    })
+    return images_dir, store
+
+
+@case("images/prepare")
+def bench_images_prepare(ctx: Context):
+    images_dir, store = image_store(ctx)
+    # max_bytes=0 にして、裏での縮小はさせずに解決だけを測る
+    return lambda: ImageAssets(images_dir, max_bytes=0, prefetch_workers=1).prepare(store)
+
+
+@case("images/render")
+def bench_images_render(ctx: Context):
+    images_dir, store = image_store(ctx)
+    assets = ImageAssets(images_dir)
+    assets.prepare(store)
+    refs = [assets.ref(q) for q in store.questions]
+    for ref in refs:
+        if ref.kind == "file":
+            assets.data(ref)
+
+    def run():
+        for q in store.questions:
+            ref = assets.ref(q)
+            if ref.kind == "file":
+                assets.data(ref)
+    return run
+
+
+# =========================
+# 実行
+# =========================
+def measure(fn) -> dict:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    number = max(1, int(number * MIN_SECONDS / 0.2))
+    times = [t / number for t in timer.repeat(repeat=REPEAT, number=number)]
+    return {"median": statistics.median(times), "min": min(times), "number": number}
+
+
+def format_time(sec: float) -> str:
+    if sec >= 1:
+        return f"{sec:8.2f} s "
+    if sec >= 1e-3:
+        return f"{sec * 1e3:8.2f} ms"
+    return f"{sec * 1e6:8.2f} µs"
+
+
+def load_baseline(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)["cases"]
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def save_baseline(path: str, results: dict) -> None:
+    cases = load_baseline(path)
+    cases.update({name: float(f"{r['min']:.4g}") for name, r in results.items()})
+    data = {
+        "machine": platform.platform(),
+        "python": platform.python_version(),
+        "saved_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "cases": dict(sorted(cases.items())),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="マイクロベンチマーク（基準値との比較）")
+    parser.add_argument("-k", "--keyword", default="", help="名前にこの文字列を含むものだけ実行")
+    parser.add_argument("--save", action="store_true", help="計測結果を基準値として保存する")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="基準値のファイル")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="許容する遅れ（0.3 = 30%%）")
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.baseline)
+    ctx = Context()
+    results, regressions = {}, []
+    try:
+        for name, setup in CASES.items():
+            if args.keyword not in name:
+                continue
+            fn = setup(ctx)
+            r = results[name] = measure(fn)
+            base = baseline.get(name)
+            if args.save:
+                rounds = [r] + [measure(fn) for _ in range(SAVE_ROUNDS - 1)]
+                r = results[name] = dict(r, min=statistics.median(x["min"] for x in rounds))
+                status = "（基準値として保存）"
+            elif base is None:
+                status = "（基準値なし）"
+            else:
+                tolerance = max(args.tolerance, FAST_TOLERANCE) if base < FAST_CASE else args.tolerance
+                for _ in range(RETRIES):
+                    if r["min"] / base <= 1 + tolerance:
+                        break
+                    retry = measure(fn)  # たまたま遅かっただけかを測り直して確かめる
+                    if retry["min"] < r["min"]:
+                        r = results[name] = retry
+                ratio = r["min"] / base
+                status = f"x{ratio:5.2f}"
+                if ratio > 1 + tolerance:
+                    status += "  !! 遅くなりました"
+                    regressions.append((name, ratio))
+            print(f"{name:<28} {format_time(r['min'])}  (中央値 {format_time(r['median'])})  {status}", flush=True)
+    finally:
+        ctx.close()
+
+    if args.save:
+        save_baseline(args.baseline, results)
+        print(f"\n基準値を保存しました：{args.baseline}")
+        return 0
+    if regressions:
+        print(f"\n!! 基準値より許容（{args.tolerance:.0%}、{FAST_CASE * 1e6:.0f}µs 未満の項目は "
+              f"{max(args.tolerance, FAST_TOLERANCE):.0%}）を超えて遅くなったもの：{len(regressions)} 件", file=sys.stderr)
+        for name, ratio in regressions:
+            print(f"!!   {name}: x{ratio:.2f}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""SPI模擬試験アプリの共通処理（app は Streamlit の画面本体、ほかのモジュールは Streamlit に依存しない）"""
@@ -0,0 +1,742 @@
+"""
+アプリ本体（spi_app.py / spi_app_20q.py から main() を呼ぶ）：
+  画面・セッション・キャッシュ（バンク、画像、回答ログ、進行状況）をここに1つだけ持つ。
+  st.cache_resource はこのモジュールの関数に付くので、どの入口から開いても同じプロセス内のキャッシュを共有する。
+  ファイル（CSV・バンク・画像）はリポジトリ直下（入口スクリプトと同階層）に置く。
+  回答ログ・進行状況は DATA_DIR（環境変数 SPI_DATA_DIR、無ければリポジトリ直下）に書く。
+"""
+import streamlit as st
+import streamlit.components.v1 as components
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+import numpy as np
+import hmac
+import time
+import os
+import uuid
+
+from spi_core.assets import ImageAssets
+from spi_core.attempt_log import AttemptLog
+from spi_core.bank import BankHandle
+from spi_core.mathhtml import prerender_question
+from spi_core.sampler import InsufficientQuestions, sample_ids, sample_mock_exam
+from spi_core.scoring import ANSWER_LABELS, NO_ANSWER, accuracy, score_session
+from spi_core.schedule import (NO_DEADLINE, PER_QUESTION, TIME_MODES, WHOLE_EXAM, build_deadlines,
+                                format_seconds, question_limits)
+from spi_core.sessions import MemorySessionBackend, SessionBackend, SessionManager, SQLiteSessionBackend
+from spi_core.stats import HIST_LABELS, read_stats
+from spi_core.question import Question
+from spi_core.store import QuestionStore
+
+# =========================
+# 設定
+# =========================
+APP_TITLE = "SPI模擬試験対策アプリ"
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # 入口スクリプトと同階層
+# 回答ログ・進行状況の書き込み先（ベンチマーク・負荷試験は一時フォルダに向けて、本番のログを汚さない）
+DATA_DIR = os.environ.get("SPI_DATA_DIR") or BASE_DIR
+DEFAULT_TIME_LIMIT = 60  # 問題に time_limit が無いときの1問あたり秒
+CSV_FILENAME = "spi_questions_converted.csv"
+ATTEMPT_DB_FILENAME = "spi_attempts.sqlite3"  # 回答ログ（1問ごとに追記）
+# 進行状況の保存先（None ならプロセス内。再起動・別のワーカープロセスでは再開できない）
+SESSION_DB_FILENAME = "spi_sessions.sqlite3"
+SESSION_PARAM = "session"  # 進行状況を引くトークンの URL パラメータ（開始時に付ける）
+# これより長く操作の無いセッション・上限を超えた分は、保存してメモリから追い出す（次の操作で保存から戻す）
+SESSION_IDLE_TTL = 30 * 60  # 秒
+SESSION_MEMORY_BUDGET = 32 << 20  # メモリ上のセッション状態の合計（バイト）
+BANK_FILENAME = "spi_questions.bank"  # CSV/XLSXからコンパイルしたバンク（python -m spi_core.compiler で作成）
+IMAGES_DIRNAME = "images"  # BASE_DIR 配下（ローカル画像用）
+IMAGE_MIRROR_DIRNAME = ".image_cache"  # image_url の複製先（None なら複製せず、ブラウザが直接取りに行く）
+# 分数・ルートをサーバー側で HTML にしてから送る（ブラウザで KaTeX の組版をしない。低スペック端末向け）
+MATH_PRERENDER = False
+
+# 模擬試験モード：複数カテゴリから決まった比率でまとめて出題
+MOCK_EXAM_LABEL = "模擬試験（言語＋非言語）"
+MOCK_EXAM_RATIO = {"言語": 1, "非言語": 1}
+
+# 結果一覧に出す問題文の文字数
+RESULT_PREVIEW_CHARS = 40
+
+# 管理画面（?view=admin&token=…）：token が st.secrets のこのキーと一致するときだけ開く（未設定なら開けない）
+ADMIN_TOKEN_SECRET = "admin_token"
+# 管理画面：回答数がこれ以上の問題だけ難易度を判定する
+ADMIN_MIN_ATTEMPTS = 10
+TOO_HARD_ACCURACY = 0.3
+TOO_EASY_ACCURACY = 0.9
+
+# 残り時間の表示はブラウザ側で行う（サーバーは毎秒再実行しない）
+COUNTDOWN_HTML = """
+<div id="countdown" style="font-family:sans-serif;padding:0.75rem 1rem;border-radius:0.5rem;
+     background:#e8f2fc;color:#0b4a7a;">⏳ 残り時間：<b id="sec">__REMAINING__</b>（__LIMIT__）</div>
+<script>
+  const end = Date.now() + __REMAINING_MS__;
+  const box = document.getElementById("countdown");
+  const sec = document.getElementById("sec");
+  function tick() {
+    const left = Math.max(0, Math.ceil((end - Date.now()) / 1000));
+    sec.textContent = left >= 60 ? Math.floor(left / 60) + "分" + String(left % 60).padStart(2, "0") + "秒"
+                                 : left + "秒";
+    if (left <= 0) {
+      box.style.background = "#fde8e8";
+      box.style.color = "#7a0b0b";
+      box.textContent = "⌛ 時間切れ（「回答する」を押すと未回答として次へ進みます）";
+      clearInterval(timer);
+    }
+  }
+  const timer = setInterval(tick, 250);
+  tick();
+</script>
+"""
+
+
+# =========================
+# ユーティリティ
+# =========================
+def render_question_image(q: Question) -> None:
+    """解決済みの画像を表示（image_url優先→なければimages/配下。描画中はファイル・ネットワークに触れない）"""
+    assets = get_image_assets()
+    ref = assets.ref(q)
+    if ref is None:
+        return
+    if ref.kind == "file":
+        st.image(assets.data(ref), use_container_width=True)
+    elif ref.kind == "url":
+        st.image(ref.url, use_container_width=True)
+    else:
+        st.warning(f"画像ファイルが見つかりません：{IMAGES_DIRNAME}/{ref.label}")
+
+
+def render_countdown(deadline: float, limit_text: str) -> None:
+    """締切時刻までのカウントダウンをブラウザ側で描画（再実行なしで毎秒更新）"""
+    remaining = max(0.0, deadline - time.time())
+    html = (
+        COUNTDOWN_HTML
+        .replace("__REMAINING_MS__", str(int(remaining * 1000)))
+        .replace("__REMAINING__", format_seconds(remaining))
+        .replace("__LIMIT__", limit_text)
+    )
+    # st.iframe が無い旧バージョンでは components.html を使う
+    if hasattr(st, "iframe"):
+        st.iframe(html, height=60)
+    else:
+        components.html(html, height=60)
+
+
+def display_question(q: Question) -> Question:
+    """表示に使う Question（MATH_PRERENDER なら数式を HTML にしたもの。問題ごとに初回だけ変換）"""
+    return prerender_question(q) if MATH_PRERENDER else q
+
+
+def render_markdown(text: str) -> None:
+    """問題の文字列を含む Markdown（事前描画の HTML はそのまま通す。本文側はエスケープ済み）"""
+    st.markdown(text, unsafe_allow_html=MATH_PRERENDER)
+
+
+def render_info(text: str) -> None:
+    """st.info は HTML を通さないので、事前描画のときは枠付きのコンテナに出す"""
+    if MATH_PRERENDER:
+        with st.container(border=True):
+            render_markdown(text)
+    else:
+        st.info(text)
+
+
+def render_choices_markdown(q: Question) -> None:
+    """選択肢をMarkdownで表示（radioにはA〜Eだけ出すので表示崩れなし）"""
+    for label, choice in zip(ANSWER_LABELS, q.choices):
+        render_markdown(f"**{label}.** {choice}")
+
+
+# =========================
+# データ読込
+# =========================
+@st.cache_resource
+def load_bank() -> BankHandle:
+    """コンパイル済みバンクはプロセスで1つだけ保持（CSVが更新されたら裏で再コンパイルして差し替え）"""
+    return BankHandle(os.path.join(BASE_DIR, BANK_FILENAME), [os.path.join(BASE_DIR, CSV_FILENAME)])
+
+
+@st.cache_resource
+def get_image_assets() -> ImageAssets:
+    """画像はプロセスで1つのキャッシュに持つ（縮小済みバイト列の LRU と image_url の複製）"""
+    mirror_dir = os.path.join(BASE_DIR, IMAGE_MIRROR_DIRNAME) if IMAGE_MIRROR_DIRNAME else None
+    return ImageAssets(os.path.join(BASE_DIR, IMAGES_DIRNAME), mirror_dir=mirror_dir)
+
+
+def prefetch_questions(start: int, stop: int) -> None:
+    """start〜stop-1 問目の画像をスレッドプールに先に用意させる（本文は読込時に変換済み）"""
+    store = st.session_state.store
+    ids = st.session_state.question_ids[start:stop]
+    get_image_assets().prefetch(store.question(qid) for qid in ids)
+
+
+def load_store() -> QuestionStore:
+    """今のバンク（全セッションで共有、セッションごとにコピーしない）"""
+    store = load_bank().current()
+    # バンクが読まれた・差し替わったときだけ画像を解決する（同じストアなら何もしない）
+    get_image_assets().prepare(store)
+    return store
+
+
+@st.cache_resource
+def get_attempt_log() -> AttemptLog:
+    """回答ログの書き込み口（キューに積むだけ。書き込みは裏のスレッドがまとめて行う）"""
+    return AttemptLog(os.path.join(DATA_DIR, ATTEMPT_DB_FILENAME))
+
+
+@st.cache_resource
+def get_session_backend() -> SessionBackend:
+    """進行状況の保存先（SQLite なら同じマシンのワーカープロセスで共有し、再起動後も再開できる）"""
+    if SESSION_DB_FILENAME:
+        return SQLiteSessionBackend(os.path.join(DATA_DIR, SESSION_DB_FILENAME))
+    return MemorySessionBackend()
+
+
+@st.cache_resource
+def get_session_manager() -> SessionManager:
+    """プロセス内のセッションの使用状況（件数・バイト数）と追い出し"""
+    backend = get_session_backend()
+    return SessionManager(
+        session_bytes,
+        lambda state: release_session(backend, state),
+        idle_ttl=SESSION_IDLE_TTL,
+        max_bytes=SESSION_MEMORY_BUDGET,
+        backend=backend,
+    )
+
+
+def log_attempt(idx: int) -> None:
+    """idx 問目の回答（時間切れを含む）を回答ログに積む"""
+    q = st.session_state.store.question(st.session_state.question_ids[idx])
+    choice = int(st.session_state.answers[idx])
+    get_attempt_log().record(
+        st.session_state.session_id,
+        q.id,
+        choice,
+        choice != NO_ANSWER and choice == q.answer,
+        st.session_state.end_times[idx] - st.session_state.start_times[idx],
+        q.category,
+    )
+
+
+# =========================
+# セッション初期化
+# =========================
+defaults = {
+    "page": "select",         # select / quiz / result
+    "q_index": 0,
+    "stage": "quiz",          # quiz / explanation（その都度採点時のみ）
+    "answers": None,          # int8 配列（0〜4 = A〜E、-1 = 未回答）
+    "start_times": None,      # 各問の表示時刻（float 配列、未表示は NaN）
+    "deadlines": None,        # 各問の締切時刻（time.time() 基準、1問ごとモードは表示時に確定）
+    "time_limits": None,      # 出題順の制限時間（秒、開始時に問題の time_limit から作る）
+    "exam_deadline": NO_DEADLINE,  # 試験全体の締切時刻（試験全体モードのみ）
+    "end_times": None,        # 各問の回答・時間切れ時刻
+    "session_id": None,       # 回答ログ用・進行状況のトークン（開始ボタンごとに発行）
+    "question_ids": None,     # 出題する問題IDの int32 配列（本文は共有ストアから引く）
+    "store": None,            # 開始時点のストア（途中でバンクが差し替わっても同じ問題を引く）
+    "bank_digest": None,      # 開始時点のバンクのソースのハッシュ（再開時に同じバンクか確かめる）
+    "category": None,
+    "num_questions": 20,
+    "mode": "その都度採点",   # その都度採点 / 最後にまとめて採点
+    "time_limit": DEFAULT_TIME_LIMIT,  # 問題に time_limit が無いときの1問あたり秒
+    "time_mode": PER_QUESTION,         # 1問ごと / 試験全体
+}
+# 保存・復元する進行状況（ストアは保存せず、復元時に共有のものを引き直す）
+SESSION_KEYS = [k for k in defaults if k != "store"]
+
+
+def save_session() -> None:
+    """進行状況をトークン（session_id）の下に保存する（開始・表示・回答・次へのたびに呼ぶ）"""
+    token = st.session_state.get("session_id")
+    if token:
+        get_session_backend().save(token, {k: st.session_state[k] for k in SESSION_KEYS})
+
+
+def session_bytes(state) -> int:
+    """セッションの状態のバイト数（配列の分。ストアは全セッションで共有なので数えない）"""
+    return sum(state[k].nbytes for k in SESSION_KEYS if k in state and isinstance(state[k], np.ndarray))
+
+
+def release_session(backend: SessionBackend, state) -> None:
+    """追い出し（裏のスレッドから呼ばれる）：保存してから状態を消す。次の操作で URL のトークンから戻す"""
+    token = state["session_id"] if "session_id" in state else None
+    if token:
+        backend.save(token, {k: state[k] for k in SESSION_KEYS})
+    for k in SESSION_KEYS + ["store"]:
+        if k in state:
+            del state[k]
+
+
+def ensure_session() -> bool:
+    """
+    操作のたびに最初に呼ぶ：使用を記録し、追い出されていれば保存から戻す（状態があれば True）。
+    記録と追い出しは同じロックの下なので、記録した後の処理中に状態が消えることはない。
+    """
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        get_session_manager().touch(ctx.session_id, ctx.session_state)
+    if "page" not in st.session_state:
+        resume_session()
+    return "page" in st.session_state
+
+
+def resume_session() -> None:
+    """URL のトークンに保存された進行状況があれば、このセッションに復元する（再接続・別プロセス）"""
+    token = st.query_params.get(SESSION_PARAM)
+    if not token:
+        return
+    state = get_session_backend().load(token)
+    try:
+        store = load_store()
+    except Exception:
+        return  # 読込エラーは最初の画面で表示する
+    # 保存が無い・バンクが変わった場合は、最初の画面から
+    # （同じIDが残っていても中身が変わっているかもしれないので、別の問題で採点しないよう再開しない）
+    if state is None or state["bank_digest"] != store.digest or not all(qid in store for qid in state["question_ids"]):
+        if state is not None:
+            st.session_state.resume_notice = "問題が更新されたため、前回の続きからは再開できません。もう一度始めてください。"
+        del st.query_params[SESSION_PARAM]
+        return
+    for k in SESSION_KEYS:
+        st.session_state[k] = state[k]
+    st.session_state.store = store
+
+
+def init_session() -> None:
+    """再実行のたびに最初に呼ぶ：追い出されていれば保存から戻し、足りないキーに既定値を入れる"""
+    ensure_session()
+    for k, v in defaults.items():
+        if k not in st.session_state:
+            st.session_state[k] = v
+
+
+# =========================
+# クイズ処理
+# =========================
+# 部分再実行：回答・次へはクイズ本体だけを再実行する（st.fragment が無い旧バージョンは全体を再実行）
+fragment = getattr(st, "fragment", None) or (lambda f: f)
+
+
+def finish_question(idx: int, choice: int, end_time: float) -> None:
+    """idx 問目の回答（時間切れは NO_ANSWER）を確定して次の状態へ進める"""
+    st.session_state.answers[idx] = choice
+    st.session_state.end_times[idx] = end_time
+    log_attempt(idx)
+    if end_time >= st.session_state.exam_deadline:
+        st.session_state.page = "result"  # 試験全体の持ち時間切れ
+    elif st.session_state.mode == "その都度採点":
+        st.session_state.stage = "explanation"
+    else:
+        st.session_state.q_index += 1
+    save_session()
+
+
+def check_deadline(idx: int) -> bool:
+    """締切を過ぎていれば時間切れとして確定する（保存済みの締切時刻と比べるだけ）"""
+    deadline = st.session_state.deadlines[idx]
+    if time.time() >= deadline:
+        finish_question(idx, NO_ANSWER, deadline)
+        return True
+    return False
+
+
+def submit_answer(idx: int) -> None:
+    """回答フォームの送信（on_click：選択と送信を1回の再実行で処理する）"""
+    if not ensure_session():
+        return
+    if check_deadline(idx):
+        return  # 締切後の送信は時間切れ扱い
+    picked = st.session_state.get(f"pick_{idx}")
+    if picked is None:
+        st.session_state.pick_missing = idx
+        return
+    finish_question(idx, ANSWER_LABELS.index(picked), time.time())  # 0〜4
+
+
+def next_question() -> None:
+    if not ensure_session():
+        return
+    st.session_state.q_index += 1
+    st.session_state.stage = "quiz"
+    save_session()
+
+
+def render_quiz():
+    idx = st.session_state.q_index
+    q = display_question(st.session_state.store.question(st.session_state.question_ids[idx]))
+
+    now = time.time()
+    if np.isnan(st.session_state.start_times[idx]):
+        if now >= st.session_state.exam_deadline:
+            # 試験全体の持ち時間切れ：まだ表示していない問題は未到達のまま終了
+            st.session_state.page = "result"
+            st.rerun()
+        # タイマー開始：1問ごとモードは表示した時点で締切時刻を確定して保存
+        st.session_state.start_times[idx] = now
+        if np.isnan(st.session_state.deadlines[idx]):
+            st.session_state.deadlines[idx] = now + st.session_state.time_limits[idx]
+        save_session()  # 再開しても表示時刻・締切は変わらない
+
+    render_markdown(f"### {q.question}")
+    render_question_image(q)
+    render_choices_markdown(q)
+
+    if st.session_state.time_mode == WHOLE_EXAM:
+        limit_text = "試験全体の持ち時間"
+    else:
+        limit_text = f"制限 {format_seconds(st.session_state.time_limits[idx])}"
+    render_countdown(st.session_state.deadlines[idx], limit_text)
+
+    # 選択と送信は1つのフォーム：選んだだけでは再実行せず、送信1回で回答を確定する
+    # 回答選択はA〜Eのみ（数式をradioに入れない）
+    with st.form(f"answer_{idx}"):
+        st.radio(
+            "回答を選んでください：",
+            ANSWER_LABELS,
+            key=f"pick_{idx}",
+            index=None,
+            horizontal=True
+        )
+        st.form_submit_button("回答する", on_click=submit_answer, args=(idx,))
+    if st.session_state.pop("pick_missing", None) == idx:
+        st.warning("A〜Eのいずれかを選んでください。")
+
+    # 解いている間に次の問題の画像を用意しておく（次へ進んだ再実行で読込待ちをしない）
+    prefetch_questions(idx + 1, idx + 2)
+
+
+def render_explanation():
+    idx = st.session_state.q_index
+    q = display_question(st.session_state.store.question(st.session_state.question_ids[idx]))
+
+    user = int(st.session_state.answers[idx])  # 0〜4、-1 = 未回答
+    correct = q.answer  # 0〜4
+
+    if user != NO_ANSWER and user == correct:
+        st.success("✅ 正解！")
+    elif user == NO_ANSWER:
+        st.error("⏱ 未回答")
+    else:
+        st.error("❌ 不正解")
+
+    # 正解表示
+    if correct != NO_ANSWER:
+        render_markdown(
+            f"**正解：{ANSWER_LABELS[correct]}**  "
+            f"{q.choices[correct]}"
+        )
+    else:
+        st.markdown("**正解：不明（CSVの answer を確認してください）**")
+
+    # 自分の回答表示
+    if user != NO_ANSWER:
+        render_markdown(
+            f"あなたの回答：**{ANSWER_LABELS[user]}**  "
+            f"{q.choices[user]}"
+        )
+    else:
+        st.markdown("あなたの回答：**未回答**")
+
+    exp = q.explanation
+    if exp:
+        render_info(f"📘 解説：{exp}")
+
+    st.button("次の問題へ", on_click=next_question)
+
+
+@fragment
+def render_quiz_page():
+    """クイズ画面の本体（この中の操作はここだけ再実行し、セッション初期化や画面の振り分けは通らない）"""
+    if not ensure_session():
+        st.rerun()  # 追い出されて戻せなかった：アプリ全体を再実行して最初の画面へ
+    idx = st.session_state.q_index
+    n = int(st.session_state.num_questions)
+    # 表示中の問題の時間切れ判定（再実行のたびに締切と比較するだけ）
+    if st.session_state.stage == "quiz" and idx < n and not np.isnan(st.session_state.start_times[idx]):
+        check_deadline(idx)
+    if st.session_state.q_index >= n:
+        st.session_state.page = "result"
+    if st.session_state.page != "quiz":
+        st.rerun()  # 結果画面へはアプリ全体を再実行して切り替える
+
+    st.title(f"Q{st.session_state.q_index + 1}/{st.session_state.num_questions}")
+
+    if st.session_state.mode == "その都度採点" and st.session_state.stage == "explanation":
+        render_explanation()
+    else:
+        render_quiz()
+
+
+def reset_session() -> None:
+    """もう一度解く：セッションを空にする（on_click で呼ぶので再実行は1回で済む）"""
+    if st.session_state.get("session_id"):
+        get_session_backend().delete(st.session_state.session_id)
+    st.query_params.pop(SESSION_PARAM, None)
+    for k in list(st.session_state.keys()):
+        del st.session_state[k]
+
+
+def render_result_detail(i: int, q: Question, user: int, ok: bool) -> None:
+    """1問分の詳細（選ばれた問題だけ描画する。画像もこのときだけ読む）"""
+    correct = q.answer
+    st.markdown(f"### Q{i+1} {'✅' if ok else '❌'}")
+    render_markdown(f"**{q.question}**")
+
+    render_question_image(q)
+    render_choices_markdown(q)
+
+    if user != NO_ANSWER:
+        render_markdown(
+            f"- あなたの回答：**{ANSWER_LABELS[user]}**  "
+            f"{q.choices[user]}"
+        )
+    else:
+        st.markdown("- あなたの回答：**未回答**")
+
+    if correct != NO_ANSWER:
+        render_markdown(
+            f"- 正解：**{ANSWER_LABELS[correct]}**  "
+            f"{q.choices[correct]}"
+        )
+    else:
+        st.markdown("- 正解：**不明**（CSVの answer を確認）")
+
+    exp = q.explanation
+    if exp:
+        render_markdown(f"📘 解説：{exp}")
+
+
+def render_result():
+    st.title("📊 結果発表")
+
+    store = st.session_state.store
+    ids = st.session_state.question_ids
+    answers = st.session_state.answers
+
+    # 採点・時間・カテゴリ別の集計は配列でまとめて行う
+    score = score_session(store, ids, answers, st.session_state.start_times, st.session_state.end_times)
+    correct = store.answer_index[store.positions(ids)]
+    questions = [store.question(qid) for qid in ids]
+
+    st.success(f"🎯 スコア：{score.total} / {st.session_state.num_questions}")
+    if score.timeouts:
+        st.caption(f"⏱ 時間切れ：{score.timeouts} 問")
+    unreached = int(np.isnan(st.session_state.end_times).sum())
+    if unreached:
+        st.caption(f"⌛ 試験時間内に解けなかった問題：{unreached} 問")
+    st.button("もう一度解く", on_click=reset_session)
+
+    # 一覧は軽い表だけ（数式・画像・解説は下で選んだ問題だけ描画）
+    labels = np.array(ANSWER_LABELS + ["—"])  # -1 は末尾の "—"
+    st.dataframe(
+        {
+            "問題": [f"Q{i+1}" for i in range(len(ids))],
+            "結果": np.where(score.correct, "✅", np.where(answers == NO_ANSWER, "⏱ 未回答", "❌")),
+            "あなたの回答": labels[answers],
+            "正解": labels[correct],
+            "時間（秒）": np.round(score.elapsed, 1),
+            "カテゴリー": [q.category for q in questions],
+            "問題文": [q.text[:RESULT_PREVIEW_CHARS] for q in questions],
+        },
+        hide_index=True,
+    )
+
+    # 複数カテゴリ（模擬試験）のときはカテゴリ別の正答率も出す
+    asked = score.category_attempts > 0
+    if asked.sum() > 1:
+        rate = accuracy(score.category_correct, score.category_attempts)
+        st.dataframe(
+            {
+                "カテゴリー": np.array(store.category_names, dtype=object)[asked],
+                "正解": score.category_correct[asked],
+                "回答": score.category_attempts[asked],
+                "正答率": [f"{r:.0%}" for r in rate[asked]],
+            },
+            hide_index=True,
+        )
+
+    pick = st.selectbox(
+        "詳細を見る問題",
+        range(len(ids)),
+        index=None,
+        format_func=lambda i: f"Q{i+1} {'✅' if score.correct[i] else '❌'}",
+        placeholder="問題を選ぶと解答・解説を表示します",
+    )
+    if pick is not None:
+        render_result_detail(pick, display_question(questions[pick]), int(answers[pick]), bool(score.correct[pick]))
+
+
+def is_admin() -> bool:
+    """?view=admin で、token が st.secrets の管理用トークンと一致するか（違えば通常の画面を出す）"""
+    if st.query_params.get("view") != "admin":
+        return False
+    try:
+        expected = st.secrets.get(ADMIN_TOKEN_SECRET)
+    except FileNotFoundError:
+        expected = None  # secrets.toml が無い
+    if not expected:
+        return False
+    token = st.query_params.get("token", "")
+    return hmac.compare_digest(token.encode("utf-8"), str(expected).encode("utf-8"))
+
+
+def render_bank_status() -> None:
+    """問題バンクの状態：再コンパイルの失敗（古いバンクのまま出題中）と検証結果"""
+    bank = load_bank()
+    header = bank.header
+    st.subheader("問題バンク")
+    built_at = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(header["built_at"]))
+    st.caption(f"{header['rows']} 問（{built_at} にコンパイル）")
+    if bank.last_error is not None:
+        st.error(f"ソースの再コンパイルに失敗したため、前のバンクのまま出題しています：{bank.last_error}")
+    if bank.issues:
+        errors = sum(1 for issue in bank.issues if issue[2] == "error")
+        with st.expander(f"検証結果：エラー {errors} 件（除外した行）/ 警告 {len(bank.issues) - errors} 件",
+                         expanded=errors > 0):
+            source, row, level, message = zip(*bank.issues)
+            st.dataframe({"ソース": source, "行": row, "種類": level, "内容": message}, hide_index=True)
+
+
+def render_admin():
+    """問題別・カテゴリ別の集計（集計テーブルだけを読む。回答ログ本体は読まない）"""
+    st.title("📈 回答の集計")
+
+    sessions = get_session_manager().stats()
+    st.caption(
+        f"このプロセス：セッション {sessions.sessions} 件（状態 {sessions.bytes / 1024:.0f} KB、"
+        f"追い出し累計 {sessions.evicted} 件） / 画像キャッシュ {get_image_assets().cached_bytes / 2**20:.1f} MB"
+    )
+    render_bank_status()
+
+    db_path = os.path.join(DATA_DIR, ATTEMPT_DB_FILENAME)
+    cats = read_stats(db_path, "category_stats")
+    qs = read_stats(db_path, "question_stats")
+    if not qs.keys:
+        st.info("まだ回答ログがありません。")
+        return
+
+    st.subheader("カテゴリー別")
+    st.dataframe(
+        {
+            "カテゴリー": cats.keys,
+            "回答数": cats.attempts,
+            "正答率": np.round(accuracy(cats.correct, cats.attempts), 3),
+            "時間切れ": cats.timeouts,
+            "平均（秒）": np.round(cats.seconds / np.maximum(cats.attempts, 1), 1),
+        },
+        hide_index=True,
+    )
+
+    st.subheader("問題別（正答率の低い順）")
+    store = load_store()
+    rate = accuracy(qs.correct, qs.attempts)
+    judged = qs.attempts >= ADMIN_MIN_ATTEMPTS
+    verdict = np.where(judged & (rate < TOO_HARD_ACCURACY), "難しすぎ",
+                       np.where(judged & (rate > TOO_EASY_ACCURACY), "易しすぎ", ""))
+    order = np.argsort(np.nan_to_num(rate, nan=2.0), kind="stable")
+    questions = [store.question(qs.keys[i]) if qs.keys[i] in store else None for i in order]
+    table = {
+        "問題ID": np.asarray(qs.keys)[order],
+        "カテゴリー": [q.category if q else "" for q in questions],
+        "問題文": [q.text[:RESULT_PREVIEW_CHARS] if q else "（削除済み）" for q in questions],
+        "回答数": qs.attempts[order],
+        "正答率": np.round(rate[order], 3),
+        "判定": verdict[order],
+        "時間切れ": qs.timeouts[order],
+        "平均（秒）": np.round(qs.seconds[order] / np.maximum(qs.attempts[order], 1), 1),
+    }
+    for j, label in enumerate(HIST_LABELS):
+        table[label] = qs.hist[order, j]
+    st.dataframe(table, hide_index=True)
+
+
+# =========================
+# 画面：select
+# =========================
+def render_select(title: str):
+    st.title(title)
+    notice = st.session_state.pop("resume_notice", None)
+    if notice:
+        st.warning(notice)
+
+    try:
+        store = load_store()
+    except Exception as e:
+        st.error(f"CSVの読み込みに失敗しました: {e}")
+        st.stop()
+
+    categories = sorted(store.by_category)
+    if all(c in store.by_category for c in MOCK_EXAM_RATIO):
+        categories.append(MOCK_EXAM_LABEL)
+    st.session_state.temp_category = st.radio("出題カテゴリー：", categories, index=0)
+    st.session_state.temp_num_questions = st.number_input("出題数（1〜50）", 1, 50, value=20)
+    st.session_state.temp_mode = st.radio("採点方法：", ["その都度採点", "最後にまとめて採点"])
+    st.session_state.temp_time_mode = st.radio("時間制限：", TIME_MODES, horizontal=True)
+    st.session_state.temp_time_limit = st.number_input(
+        "制限時間（1問あたり秒、問題に設定が無い場合）", 5, 600, value=DEFAULT_TIME_LIMIT
+    )
+    if st.session_state.temp_time_mode == WHOLE_EXAM:
+        st.session_state.temp_time_budget = st.number_input(
+            "試験全体の持ち時間（分、0 = 各問の制限時間の合計）", 0, 300, value=0
+        )
+
+    if st.button("開始"):
+        cat = st.session_state.temp_category
+        n = int(st.session_state.temp_num_questions)
+
+        try:
+            if cat == MOCK_EXAM_LABEL:
+                question_ids = sample_mock_exam(store.by_category, MOCK_EXAM_RATIO, n)
+            else:
+                question_ids = sample_ids(store.by_category, cat, n)
+        except InsufficientQuestions as e:
+            st.error(str(e))
+            st.stop()
+
+        st.session_state.category = cat
+        st.session_state.num_questions = n
+        st.session_state.mode = st.session_state.temp_mode
+        st.session_state.time_limit = int(st.session_state.temp_time_limit)
+        st.session_state.time_mode = st.session_state.temp_time_mode
+
+        st.session_state.session_id = uuid.uuid4().hex
+        st.session_state.question_ids = question_ids
+        st.session_state.store = store
+        st.session_state.bank_digest = store.digest
+        st.session_state.answers = np.full(n, NO_ANSWER, dtype=np.int8)
+        st.session_state.start_times = np.full(n, np.nan)
+        # 制限時間と締切はここで一度に決める（以降は締切時刻と比べるだけ）
+        limits = question_limits(store, question_ids, st.session_state.time_limit)
+        budget = 0
+        if st.session_state.time_mode == WHOLE_EXAM:
+            budget = 60 * int(st.session_state.temp_time_budget)
+        st.session_state.time_limits = limits
+        st.session_state.deadlines, st.session_state.exam_deadline = build_deadlines(
+            time.time(), limits, st.session_state.time_mode, budget
+        )
+        st.session_state.end_times = np.full(n, np.nan)
+        st.session_state.q_index = 0
+        # 最後にまとめて採点：解説を挟まず続けて進むので、全問分を先に用意する
+        prefetch_questions(0, n if st.session_state.mode == "最後にまとめて採点" else 1)
+        st.session_state.stage = "quiz"
+        st.session_state.page = "quiz"
+        st.query_params[SESSION_PARAM] = st.session_state.session_id
+        save_session()
+        st.rerun()
+
+
+# =========================
+# 画面の振り分け（入口スクリプトから再実行のたびに呼ぶ）
+# =========================
+def main(title: str = APP_TITLE) -> None:
+    """admin（?view=admin&token=…） / select / quiz / result のいずれかを描画する"""
+    init_session()
+
+    if is_admin():
+        render_admin()
+    elif st.session_state.page == "select":
+        render_select(title)
+    elif st.session_state.page == "quiz":
+        render_quiz_page()
+    elif st.session_state.page == "result":
+        render_result()
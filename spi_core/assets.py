@@ -0,0 +1,257 @@
+"""
+画像アセット：
+  バンクを読んだ時点で、問題の画像（image_url / images/ 配下のファイル）を一度だけ解決・検証する。
+  ローカル画像は表示幅まで縮小したバイト列にしてメモリ上の LRU（合計バイト数で上限）に持ち、
+  image_url は任意でローカルのキャッシュフォルダ（内容の sha256 をファイル名にする）に複製する。
+  描画時は解決済みの参照とバイト列を引くだけで、ファイルシステムやネットワークには触れない。
+  次に表示する問題の画像は prefetch() でスレッドプールに先に用意させておく。
+"""
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import urllib.request
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlparse
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow が無ければ縮小せずそのままのバイト列を持つ
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# centered レイアウトの本文幅（約 704px）を高解像度ディスプレイでも粗く見えない程度に
+DISPLAY_WIDTH = 1408
+MAX_CACHE_BYTES = 64 << 20
+DOWNLOAD_TIMEOUT = 10.0
+PREFETCH_WORKERS = 4
+
+# 解決結果：kind は file（ローカル・複製済み）/ url（複製しない・未複製）/ missing
+ImageRef = namedtuple("ImageRef", ["kind", "path", "url", "label"])
+
+
+def is_http_url(s: str) -> bool:
+    try:
+        u = urlparse(s)
+        return u.scheme in ("http", "https") and bool(u.netloc)
+    except Exception:
+        return False
+
+
+def downscale(data: bytes, width: int) -> bytes:
+    """表示幅より大きい画像だけ縮小する（形式は元のまま、Pillow が無ければ何もしない）"""
+    if Image is None:
+        return data
+    with Image.open(io.BytesIO(data)) as img:
+        if img.width <= width:
+            return data
+        fmt = img.format or "PNG"
+        height = max(1, round(img.height * width / img.width))
+        small = img.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+        if fmt == "JPEG" and small.mode not in ("RGB", "L"):
+            small = small.convert("RGB")
+        out = io.BytesIO()
+        small.save(out, format=fmt)
+        return out.getvalue()
+
+
+class ImageMirror:
+    """image_url の複製先（内容の sha256 をファイル名にし、URL → ファイル名は index.json に持つ）"""
+
+    def __init__(self, mirror_dir: str):
+        self.mirror_dir = mirror_dir
+        self._index_path = os.path.join(mirror_dir, "index.json")
+        self._lock = threading.Lock()
+        try:
+            with open(self._index_path, encoding="utf-8") as f:
+                self._index = json.load(f)
+        except (OSError, ValueError):
+            self._index = {}
+
+    def lookup(self, url: str):
+        """複製済みならファイルパス、未複製なら None"""
+        name = self._index.get(url)
+        if name is None:
+            return None
+        path = os.path.join(self.mirror_dir, name)
+        return path if os.path.exists(path) else None
+
+    def fetch(self, url: str) -> str:
+        """ダウンロードして保存し、ファイルパスを返す（同じ内容なら同じファイルを共有）"""
+        with urllib.request.urlopen(url, timeout=DOWNLOAD_TIMEOUT) as res:
+            data = res.read()
+        ext = os.path.splitext(urlparse(url).path)[1].lower()[:8]
+        name = hashlib.sha256(data).hexdigest() + ext
+        path = os.path.join(self.mirror_dir, name)
+        with self._lock:
+            os.makedirs(self.mirror_dir, exist_ok=True)
+            if not os.path.exists(path):
+                _atomic_write(path, data)
+            self._index[url] = name
+            _atomic_write(self._index_path, json.dumps(self._index, ensure_ascii=False, indent=1).encode("utf-8"))
+        return path
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class ImageAssets:
+    """
+    プロセスで1つだけ持つ画像キャッシュ（全セッションで共有）。
+      prepare(store) : バンクを読んだら呼ぶ。画像を解決し、裏のスレッドで縮小・複製を進める
+      ref(q)         : Question → ImageRef（解決済みの表を引くだけ）
+      data(ref)      : 縮小済みのバイト列（LRU、上限を超えたら古いものから捨てる）
+      prefetch(qs)   : これから表示する問題の画像を裏で用意する（用意済み・準備中なら何もしない）
+    """
+
+    def __init__(self, images_dir: str, display_width: int = DISPLAY_WIDTH,
+                 max_bytes: int = MAX_CACHE_BYTES, mirror_dir: str = None,
+                 prefetch_workers: int = PREFETCH_WORKERS):
+        self.images_dir = images_dir
+        self.display_width = display_width
+        self.max_bytes = max_bytes
+        self.mirror = ImageMirror(mirror_dir) if mirror_dir else None
+        self.cached_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._refs = {}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._prepared = None
+        self._loading = {}   # 読込中のパス → Future（同じ画像を2回縮小しない）
+        self._pending = {}   # 先読み中のキー → Future
+        self._pool = ThreadPoolExecutor(max_workers=prefetch_workers, thread_name_prefix="spi-image-prefetch")
+
+    # -------- 解決 --------
+    def _resolve(self, image_url: str, image_name: str):
+        """image_url 優先 → なければ images/ 配下のファイル（元の表示の優先順位と同じ）"""
+        if image_url and is_http_url(image_url):
+            path = self.mirror.lookup(image_url) if self.mirror else None
+            if path:
+                return ImageRef("file", path, image_url, image_url)
+            return ImageRef("url", None, image_url, image_url)
+        if image_name:
+            path = os.path.join(self.images_dir, image_name)
+            if os.path.isfile(path):
+                return ImageRef("file", path, None, image_name)
+            return ImageRef("missing", None, None, image_name)
+        return None
+
+    def prepare(self, store) -> None:
+        """ストアの画像をすべて解決する（同じストアなら何もしない）"""
+        if store is self._prepared:
+            return
+        refs = {}
+        for q in store.questions:
+            if q.image is not None and q.image not in refs:
+                refs[q.image] = self._resolve(*q.image)
+        self._refs = refs
+        self._prepared = store
+        if refs:
+            threading.Thread(target=self._warm_all, args=(list(refs.items()),),
+                             name="spi-image-warm", daemon=True).start()
+
+    def _warm_all(self, items: list) -> None:
+        # 1件ずつプールに渡して完了を待つ（先読みの依頼がこの後ろに長く並ばないように）
+        for key, ref in items:
+            # 上限に達したら全体の準備はやめる（残りは先読み・表示時に読む）
+            if ref.kind == "file" and self.cached_bytes >= self.max_bytes:
+                continue
+            future = self._submit(key, ref)
+            if future is not None:
+                future.exception()
+
+    def _materialize(self, key: tuple, ref: ImageRef) -> None:
+        """image_url なら複製し、ローカルファイルなら縮小してキャッシュに載せる"""
+        try:
+            if ref.kind == "url" and self.mirror:
+                path = self.mirror.fetch(ref.url)
+                ref = self._refs[key] = ImageRef("file", path, ref.url, ref.label)
+            if ref.kind == "file":
+                self.data(ref)
+        except Exception as e:
+            logger.warning("画像を準備できませんでした（%s）: %s", ref.label, e)
+
+    def _submit(self, key: tuple, ref: ImageRef):
+        """用意が必要なものだけプールに渡す（準備中なら同じ Future を返す）"""
+        if ref.kind == "missing" or (ref.kind == "url" and not self.mirror):
+            return None
+        with self._lock:
+            if ref.kind == "file" and ref.path in self._cache:
+                return None
+            future = self._pending.get(key)
+            if future is None:
+                future = self._pending[key] = self._pool.submit(self._materialize, key, ref)
+                future.add_done_callback(lambda _, key=key: self._pending.pop(key, None))
+        return future
+
+    def prefetch(self, questions) -> list:
+        """Question 群の画像を裏で用意する（戻り値は待ちたいとき用の Future のリスト）"""
+        futures = []
+        for q in questions:
+            if q.image is None:
+                continue
+            future = self._submit(q.image, self.ref(q))
+            if future is not None:
+                futures.append(future)
+        return futures
+
+    def ref(self, q):
+        """Question → ImageRef（画像なしは None）"""
+        key = q.image
+        if key is None:
+            return None
+        ref = self._refs.get(key)
+        if ref is None:
+            # 開始後にバンクが差し替わった場合など、表に無いものだけその場で解決する
+            ref = self._refs[key] = self._resolve(*key)
+        return ref
+
+    # -------- バイト列（LRU） --------
+    def data(self, ref: ImageRef) -> bytes:
+        with self._lock:
+            data = self._cache.get(ref.path)
+            if data is not None:
+                self._cache.move_to_end(ref.path)
+                self.hits += 1
+                return data
+            # 先読みが同じ画像を読込中なら、その完了を待つ
+            loading = self._loading.get(ref.path)
+            if loading is None:
+                loading = self._loading[ref.path] = Future()
+                self.misses += 1
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            return loading.result()
+
+        try:
+            with open(ref.path, "rb") as f:
+                data = downscale(f.read(), self.display_width)
+        except BaseException as e:
+            with self._lock:
+                self._loading.pop(ref.path, None)
+            loading.set_exception(e)
+            raise
+        with self._lock:
+            self._cache[ref.path] = data
+            self.cached_bytes += len(data)
+            while self.cached_bytes > self.max_bytes and len(self._cache) > 1:
+                _, old = self._cache.popitem(last=False)
+                self.cached_bytes -= len(old)
+            self._loading.pop(ref.path, None)
+        loading.set_result(data)
+        return data
@@ -0,0 +1,150 @@
+"""
+回答ログ：
+  1問回答するごとに (問題ID, 選択, 正誤, 所要秒数, セッションID, カテゴリ) を SQLite に追記する。
+  record() はキューに積むだけで戻り、書き込みは専用スレッドがまとめて（1トランザクションで）行う。
+  同じトランザクションで問題別・カテゴリ別の集計テーブル（spi_core.stats）も加算する。
+  クイズの再実行がディスク待ちになることはない。
+
+  flush() : 呼んだ時点までに record() したものがコミットされるまで待つ
+  close() : 残りをすべて書き込んでからスレッドを止める（プロセス終了時にも自動で呼ばれる）
+"""
+import atexit
+import logging
+import queue
+import sqlite3
+import threading
+import time
+
+from spi_core import stats
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    id          INTEGER PRIMARY KEY,
+    answered_at REAL    NOT NULL,   -- time.time()
+    session_id  TEXT    NOT NULL,
+    question_id INTEGER NOT NULL,
+    choice      INTEGER NOT NULL,   -- 0〜4 = A〜E、-1 = 時間切れ
+    correct     INTEGER NOT NULL,   -- 0 / 1
+    elapsed     REAL,               -- 秒
+    category    TEXT    NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS attempts_question ON attempts (question_id);
+"""
+
+INSERT = ("INSERT INTO attempts (answered_at, session_id, question_id, choice, correct, elapsed, category) "
+          "VALUES (?, ?, ?, ?, ?, ?, ?)")
+
+_STOP = object()
+
+
+class AttemptLog:
+    """回答ログの書き込み口（プロセスで1つだけ作り、全セッションで共有する）"""
+
+    def __init__(self, db_path: str, batch_size: int = 500, flush_interval: float = 1.0):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.last_error = None
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="spi-attempt-log", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, session_id: str, question_id: int, choice: int, correct: bool, elapsed: float,
+               category: str = "") -> None:
+        """キューに積むだけ（ロック待ち・ディスク待ちなし）"""
+        if self._closed:
+            raise RuntimeError("AttemptLog は close 済みです")
+        self._queue.put((time.time(), session_id, int(question_id), int(choice), int(bool(correct)),
+                         float(elapsed), category))
+
+    def flush(self, timeout: float = None) -> bool:
+        """ここまでの record() がコミットされるまで待つ（タイムアウトしたら False）"""
+        if not self._thread.is_alive():
+            return self._queue.empty()
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """残りを書き込んでから止める（2回目以降は何もしない）"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        atexit.unregister(self.close)
+
+    def _run(self) -> None:
+        # 接続は書き込みスレッドだけが持つ（プロセス内のロック競合なし）
+        conn = sqlite3.connect(self.db_path, timeout=30.0)
+        try:
+            # WAL：複数プロセスから書いても読み手を止めない
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._migrate(conn)
+
+            stop = False
+            while not stop:
+                rows, waiters = [], []
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    continue
+                # 溜まっている分をまとめて取り出す（batch_size まで）
+                while True:
+                    if item is _STOP:
+                        stop = True
+                    elif isinstance(item, threading.Event):
+                        waiters.append(item)
+                    else:
+                        rows.append(item)
+                    if len(rows) >= self.batch_size:
+                        break
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                if rows:
+                    self._write(conn, rows)
+                for w in waiters:
+                    w.set()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection) -> None:
+        conn.executescript(SCHEMA)
+        columns = {r[1] for r in conn.execute("PRAGMA table_info(attempts)")}
+        if "category" not in columns:
+            conn.execute("ALTER TABLE attempts ADD COLUMN category TEXT NOT NULL DEFAULT ''")
+        conn.executescript(stats.SCHEMA)
+        if conn.execute("PRAGMA user_version").fetchone()[0] < stats.ID_VERSION:
+            # 旧形式の問題ID（行番号）は今の問題を指さないので、負の値にして残し集計を作り直す
+            # （今のIDは 1 以上なのでぶつからない。管理画面では削除済みの問題として出る）
+            with conn:
+                conn.execute("UPDATE attempts SET question_id = -1 - question_id WHERE question_id >= 0")
+            if conn.execute("SELECT 1 FROM attempts LIMIT 1").fetchone():
+                stats.rebuild(conn)
+            conn.execute(f"PRAGMA user_version = {stats.ID_VERSION}")
+        # 集計テーブルが空でログだけある（集計導入前のDB）なら一度だけ作り直す
+        has_stats = conn.execute("SELECT 1 FROM question_stats LIMIT 1").fetchone()
+        if not has_stats and conn.execute("SELECT 1 FROM attempts LIMIT 1").fetchone():
+            stats.rebuild(conn)
+
+    def _write(self, conn: sqlite3.Connection, rows: list) -> None:
+        for attempt in range(3):
+            try:
+                with conn:
+                    conn.executemany(INSERT, rows)
+                    stats.apply_batch(conn, rows)
+                self.written += len(rows)
+                return
+            except sqlite3.Error as e:
+                self.last_error = e
+                time.sleep(0.1 * (attempt + 1))
+        logger.error("回答ログを %d 件書き込めませんでした: %s", len(rows), self.last_error)
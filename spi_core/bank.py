@@ -0,0 +1,187 @@
+"""
+問題バンク：
+  spi_core.compiler が作ったコンパイル済みバンク（pickle）を読み、アプリはそれを使うだけにする。
+  ソースの mtime / ハッシュが変わったら裏のスレッドで再コンパイルして差し替える。
+  再コンパイルの失敗・検証結果はログに出し、管理画面でも見られるように持っておく。
+"""
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+
+from spi_core.store import QuestionStore
+
+logger = logging.getLogger(__name__)
+
+BANK_FORMAT = 7
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def sources_digest(paths: list) -> str:
+    """ソース全体のハッシュ（バンクが最新かどうかの判定に使う）"""
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(file_sha256(path).encode("ascii"))
+    return h.hexdigest()
+
+
+def write_bank(bank_path: str, header: dict, payload: dict) -> None:
+    """一時ファイルに書いてから os.replace で原子的に置き換える（読み手が書きかけを見ない）"""
+    tmp_path = f"{bank_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            # ヘッダーだけ先に読めるよう、ヘッダーと本体を別々に書く
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, bank_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _read_header(f, bank_path: str) -> dict:
+    header = pickle.load(f)
+    if not isinstance(header, dict) or header.get("format") != BANK_FORMAT:
+        raise ValueError(f"バンクの形式が違います: {bank_path}")
+    return header
+
+
+def read_bank_header(bank_path: str) -> dict:
+    with open(bank_path, "rb") as f:
+        return _read_header(f, bank_path)
+
+
+def load_bank(bank_path: str) -> tuple:
+    """バンクファイルを読み、(header, QuestionStore) を返す"""
+    with open(bank_path, "rb") as f:
+        header = _read_header(f, bank_path)
+        payload = pickle.load(f)
+    return header, QuestionStore(payload["ids"], payload["columns"], header["source_sha256"])
+
+
+def header_sources(bank_path: str, header: dict) -> list:
+    """ヘッダーに記録されたソースのパス（バンクファイルからの相対パスを解決）"""
+    bank_dir = os.path.dirname(os.path.abspath(bank_path))
+    return [os.path.normpath(os.path.join(bank_dir, s["path"])) for s in header.get("sources", [])]
+
+
+class BankHandle:
+    """
+    プロセスで1つだけ持つバンクへの参照。
+      current() は今のストアを返すだけ（数秒に1回ソースの mtime を確認）。
+      ソースが変わっていたら裏のスレッドで再コンパイルし、完成したストアに差し替える。
+      差し替え中も current() は古いストアを返すので、回答中のセッションは止まらない。
+
+    監視するソースはバンクのヘッダーに記録されたもの（コンパイラで複数ソースから作った
+    バンクならそのすべて）。バンクがまだ無いときは default_sources からコンパイルする。
+    """
+
+    def __init__(self, bank_path: str, default_sources: list, check_interval: float = 2.0):
+        self.bank_path = bank_path
+        self.sources = [os.path.abspath(p) for p in default_sources]
+        self.check_interval = check_interval
+        self.version = 0
+        self.header = None
+        self.issues = []         # 今のバンクの検証結果 (source, row, level, message)
+        self.last_error = None   # 直近の再コンパイルの失敗（成功したら None。古いバンクのまま出題している）
+        self.last_reload_seconds = None
+        self._lock = threading.Lock()
+        self._next_check = 0.0
+        self._source_mtimes = None
+        self._store = None
+        self._open()
+
+    def current(self) -> QuestionStore:
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.check_interval
+            self._check_sources()
+        return self._store
+
+    def _stat_sources(self) -> tuple:
+        mtimes = []
+        for path in self.sources:
+            try:
+                mtimes.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def _open(self) -> None:
+        """起動時：バンクがソースと一致していればそのまま読み、違えばコンパイルしてから読む"""
+        try:
+            self.sources = header_sources(self.bank_path, read_bank_header(self.bank_path)) or self.sources
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+            pass
+        self._source_mtimes = self._stat_sources()
+        if None in self._source_mtimes:
+            # ソースを置かずにバンクだけ配布する運用
+            self._swap(*load_bank(self.bank_path))
+            return
+        self._load_if_changed(sources_digest(self.sources))
+
+    def _check_sources(self) -> None:
+        mtimes = self._stat_sources()
+        if mtimes == self._source_mtimes:
+            return
+        # 再読込中なら何もしない（次の確認で拾う）
+        if not self._lock.acquire(blocking=False):
+            return
+        self._source_mtimes = mtimes
+        threading.Thread(target=self._reload, name="spi-bank-reload", daemon=True).start()
+
+    def _reload(self) -> None:
+        t0 = time.perf_counter()
+        try:
+            if self._load_if_changed(sources_digest(self.sources)):
+                self.last_reload_seconds = time.perf_counter() - t0
+            self.last_error = None
+        except Exception as e:
+            # 編集途中の壊れたCSVなどは古いストアのまま使い続ける
+            self.last_error = e
+            logger.error("問題バンクを再コンパイルできませんでした（前のバンクのまま出題します）: %s", e)
+        finally:
+            self._lock.release()
+
+    def _load_if_changed(self, digest: str) -> bool:
+        if self.header is not None and self.header["source_sha256"] == digest:
+            return False
+        try:
+            fresh = read_bank_header(self.bank_path)["source_sha256"] == digest
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+            fresh = False
+
+        if fresh:
+            # コンパイラまたは別プロセスがコンパイル済み
+            self._swap(*load_bank(self.bank_path))
+            return True
+
+        # コンパイラ（pandas）は再コンパイルが必要なときだけ読み込む
+        from spi_core.compiler import build_bank
+
+        header, payload, _ = build_bank(self.sources, self.bank_path)
+        try:
+            write_bank(self.bank_path, header, payload)
+        except OSError:
+            pass  # 書き込めない環境ではメモリ上のバンクだけ使う
+        self._swap(header, QuestionStore(payload["ids"], payload["columns"], header["source_sha256"]))
+        return True
+
+    def _swap(self, header: dict, store: QuestionStore) -> None:
+        # 参照の代入だけで切り替える（読み手はロック不要）
+        self._store = store
+        self.header = header
+        self.issues = header.get("issues", [])
+        self.version += 1
+        errors = sum(1 for issue in self.issues if issue[2] == "error")
+        if errors:
+            logger.warning("問題バンクの検証：エラー %d 件（除外）/ 警告 %d 件", errors, len(self.issues) - errors)
@@ -0,0 +1,80 @@
+"""
+クイズの進行状況のチェックポイント（小さな固定形式のバイト列）：
+  開始後の状態（出題ID・回答・各問の時刻・モード・制限時間など）を回答のたびに保存する形式。
+  配列は int32 の問題ID / int8 の回答 / float32 の時刻としてそのまま並べる（50問で約1KB）。
+  float32 で time.time() をそのまま持つと約2分単位に丸まるので、時刻は基準時刻（float64）からの
+  差（秒）で持つ（数時間の差でも 1ms 未満の誤差）。
+
+  レイアウト（リトルエンディアン）：
+    ヘッダー  magic "SPQ" + 形式番号, q_index, num_questions, 問題数 n, time_limit, 基準時刻, exam_deadline
+    文字列    page, stage, mode, time_mode, category, session_id, bank_digest（それぞれ長さ u16 + UTF-8）
+    配列      question_ids i4[n], answers i1[n], time_limits f4[n],
+              start_times / deadlines / end_times f4[n]（基準時刻からの差、未設定は NaN）
+"""
+import struct
+
+import numpy as np
+
+MAGIC = b"SPQ"
+CHECKPOINT_FORMAT = 2
+
+_HEADER = struct.Struct("<3sBHHHIdd")
+_LENGTH = struct.Struct("<H")
+STRING_FIELDS = ("page", "stage", "mode", "time_mode", "category", "session_id", "bank_digest")
+TIME_FIELDS = ("start_times", "deadlines", "end_times")
+# (キー, 保存時の型, 復元後の型)
+ARRAY_FIELDS = (("question_ids", "<i4", np.int32), ("answers", "i1", np.int8), ("time_limits", "<f4", np.float64))
+
+
+def encode_checkpoint(state: dict) -> bytes:
+    """開始後の状態 → バイト列"""
+    n = len(state["question_ids"])
+    times = [np.asarray(state[k], dtype=np.float64) for k in TIME_FIELDS]
+    finite = np.concatenate(times)
+    finite = finite[np.isfinite(finite)]
+    base = float(finite.min()) if finite.size else 0.0
+
+    parts = [_HEADER.pack(MAGIC, CHECKPOINT_FORMAT, int(state["q_index"]), int(state["num_questions"]), n,
+                          int(state["time_limit"]), base, float(state["exam_deadline"]))]
+    for k in STRING_FIELDS:
+        data = (state[k] or "").encode("utf-8")
+        parts.append(_LENGTH.pack(len(data)))
+        parts.append(data)
+    for k, dtype, _ in ARRAY_FIELDS:
+        parts.append(np.asarray(state[k]).astype(dtype, copy=False).tobytes())
+    for t in times:
+        parts.append((t - base).astype("<f4").tobytes())
+    return b"".join(parts)
+
+
+def decode_checkpoint(data: bytes) -> dict:
+    """バイト列 → 状態（配列は書き換えられるコピー。形式が違えば ValueError）"""
+    try:
+        magic, version, q_index, num_questions, n, time_limit, base, exam_deadline = _HEADER.unpack_from(data)
+    except struct.error as e:
+        raise ValueError(f"チェックポイントが壊れています: {e}") from None
+    if magic != MAGIC or version != CHECKPOINT_FORMAT:
+        raise ValueError(f"チェックポイントの形式が違います（{magic!r} / {version}）")
+
+    state = {"q_index": q_index, "num_questions": num_questions, "time_limit": time_limit,
+             "exam_deadline": exam_deadline}
+    pos = _HEADER.size
+    try:
+        for k in STRING_FIELDS:
+            (length,) = _LENGTH.unpack_from(data, pos)
+            pos += _LENGTH.size
+            state[k] = data[pos:pos + length].decode("utf-8")
+            pos += length
+        for k, dtype, restored in ARRAY_FIELDS:
+            a = np.frombuffer(data, dtype=dtype, count=n, offset=pos)
+            state[k] = a.astype(restored)
+            pos += a.nbytes
+        for k in TIME_FIELDS:
+            a = np.frombuffer(data, dtype="<f4", count=n, offset=pos)
+            state[k] = a.astype(np.float64) + base
+            pos += a.nbytes
+    except (struct.error, ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"チェックポイントが壊れています: {e}") from None
+    if pos != len(data):
+        raise ValueError("チェックポイントの長さが合いません")
+    return state
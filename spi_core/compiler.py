@@ -0,0 +1,350 @@
+"""
+問題バンクのコンパイラ：
+  複数の CSV / XLSX（シートごと）を共通の列構成にそろえ、行ごとに検証して
+  アプリが読む1つのバンクファイルにまとめる。検証はここで済ませ、アプリ側では行わない。
+  文字列の掃除（前後空白・"nan"/"none"・ダブルクォート）も列ごとにここで一度だけ行い、
+  正解は 0〜4 の int8 にして保存する（a〜e / 1〜5 にならない行は除外して報告）。
+  問題IDは id 列があればその値、無ければ問題文と選択肢のハッシュにする（行を足し引き・並べ替えても変わらない）。
+  同じ問題文・選択肢の行は重複として除外する。別の問題どうしでハッシュがぶつかったときは、
+  ソース順で後の行に次の空きIDを使って警告する（ずっと同じIDにしたい問題は id 列で固定する）。
+
+  python -m spi_core.compiler spi_questions_converted.csv spi_questions.xlsx -o spi_questions.bank
+"""
+import argparse
+import hashlib
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from spi_core.bank import BANK_FORMAT, file_sha256, sources_digest, write_bank
+from spi_core.display import add_display_columns, clean_series
+from spi_core.scoring import ANSWER_LETTERS, NO_ANSWER
+
+REQUIRED_COLUMNS = ["category", "question", "answer",
+                    "choice1", "choice2", "choice3", "choice4", "choice5"]
+OPTIONAL_COLUMNS = ["image", "image_url", "explanation", "time_limit"]
+CHOICE_COLUMNS = ["choice1", "choice2", "choice3", "choice4", "choice5"]
+NUMERIC_COLUMNS = ["answer", "time_limit"]  # バンクでは数値で持つ列（ほかはすべて文字列）
+ID_COLUMN = "id"  # 任意：問題ID（1 以上の整数）。空の行は内容のハッシュを使う
+MAX_ID = 2**31 - 1  # セッション・チェックポイントでは int32 で持つ
+# コンパイル中だけ持つ列（バンクには入れない）：ソース名と行番号（検証結果で行を指すため）、問題文・選択肢
+SOURCE_COLUMN = "_source"
+ROW_COLUMN = "_row"
+KEY_COLUMN = "_key"
+IMAGES_DIRNAME = "images"
+
+# 読込単位（CSVは1ファイル、XLSXは1シート）
+Unit = namedtuple("Unit", ["path", "sheet"])
+# 検証結果1件（row はスプレッドシート上の行番号、ヘッダーが1行目）
+Issue = namedtuple("Issue", ["source", "row", "level", "message"])
+
+
+def unit_label(unit: Unit) -> str:
+    name = os.path.basename(unit.path)
+    return f"{name}[{unit.sheet}]" if unit.sheet is not None else name
+
+
+# =========================
+# 読込（★重要：dtype=strで数値化を防ぐ）
+# =========================
+def read_unit(unit: Unit) -> pd.DataFrame:
+    # ★ここが核心：全列を文字列で読み、"1/3" が 0.333... に化けないようにする
+    options = dict(dtype=str, keep_default_na=False, na_filter=False)
+    if unit.sheet is not None:
+        df = pd.read_excel(unit.path, sheet_name=unit.sheet, **options)
+    else:
+        df = pd.read_csv(unit.path, encoding="utf-8", **options)
+    df.columns = df.columns.astype(str).str.strip().str.lower()
+    return df
+
+
+def normalize_answer_series(col: pd.Series) -> pd.Series:
+    """normalize_answer_letter の列版（全角・大文字も a-e に、1〜5 の番号も a-e に）"""
+    s = col.astype(str).str.normalize("NFKC").str.strip().str.lower()
+    return s.replace({str(i + 1): letter for i, letter in enumerate(ANSWER_LETTERS)})
+
+
+def content_key(question: str, choices: tuple) -> str:
+    """重複を判定する問題の中身（掃除済みの問題文と選択肢）"""
+    return "\x1f".join((question,) + tuple(choices))
+
+
+def content_id(question: str, choices: tuple) -> int:
+    """問題文と選択肢（掃除済み）から作る問題ID（sha256 の先頭 31 ビット、0 は使わない）"""
+    return _key_id(content_key(question, choices))
+
+
+def _key_id(key: str) -> int:
+    return int.from_bytes(hashlib.sha256(key.encode("utf-8")).digest()[:4], "big") & MAX_ID or 1
+
+
+def check_unit(unit: Unit, images_dir: str) -> tuple:
+    """
+    1単位を読み、列構成をそろえて検証する。
+    戻り値：(採用した行の DataFrame（問題IDは未割当。id 列は指定の値か 0、コンパイル中の列付き）,
+            Issue のリスト, 読んだ行数)
+    """
+    source = unit_label(unit)
+    df = read_unit(unit)
+    issues = []
+
+    for c in ["question", "answer"]:
+        if c not in df.columns:
+            issues.append(Issue(source, None, "error", f"必須列がありません: {c}"))
+    if issues:
+        return df.iloc[0:0], issues, len(df)
+
+    # 足りない列は空で作る（空の値は下で行ごとに報告する）
+    # safe_str と同じ掃除を列ごとにまとめて行う（アプリ側では文字列を加工しない）
+    for c in REQUIRED_COLUMNS + OPTIONAL_COLUMNS:
+        if c not in df.columns:
+            df[c] = ""
+        df[c] = clean_series(df[c])
+    letters = normalize_answer_series(df["answer"])
+    answer = letters.map({letter: i for i, letter in enumerate(ANSWER_LETTERS)})
+
+    line = df.index.to_numpy() + 2
+    keep = pd.Series(True, index=df.index)
+
+    def report(mask: pd.Series, level: str, message: str) -> None:
+        for row in line[mask.to_numpy()]:
+            issues.append(Issue(source, int(row), level, message))
+
+    empty_question = df["question"] == ""
+    bad_answer = answer.isna() & ~empty_question
+    report(empty_question, "error", "question が空（除外）")
+    report(bad_answer, "error", "answer が a〜e / 1〜5 ではありません（除外）")
+    keep &= ~empty_question & ~bad_answer
+
+    report(keep & (df["category"] == ""), "warning", "category が空")
+    for c in CHOICE_COLUMNS:
+        report(keep & (df[c] == ""), "warning", f"選択肢が空（{c}）")
+
+    # id 列の値（空なら 0 = assign_ids で問題文・選択肢のハッシュを使う）
+    if ID_COLUMN in df.columns:
+        raw_id = clean_series(df[ID_COLUMN]).str.normalize("NFKC")
+        explicit = pd.to_numeric(raw_id, errors="coerce")
+        valid = (explicit >= 1) & (explicit <= MAX_ID) & (explicit % 1 == 0)
+        bad_id = (raw_id != "") & ~valid
+        report(keep & bad_id, "error", f"id が 1〜{MAX_ID} の整数ではありません（除外）")
+        keep &= ~bad_id
+        df[ID_COLUMN] = explicit.where(valid, 0).astype(np.int64)
+    else:
+        df[ID_COLUMN] = np.int64(0)
+
+    # 正解は 0〜4 の int8（除外しない行も含めて -1 で埋めてから型をそろえる）
+    df["answer"] = answer.fillna(NO_ANSWER).astype(np.int8)
+
+    # 問題ごとの制限時間（秒）はここで数値にする（空・不正は NaN = アプリ側の既定を使う）
+    raw_limit = df["time_limit"].str.normalize("NFKC")
+    limit = pd.to_numeric(raw_limit, errors="coerce")
+    report(keep & (raw_limit != "") & ~(limit > 0), "warning", "time_limit が正の数ではありません（既定の制限時間を使用）")
+    df["time_limit"] = limit.where(limit > 0)
+
+    has_image = keep & (df["image"] != "")
+    for row, name in zip(line[has_image.to_numpy()], df.loc[has_image, "image"]):
+        if not os.path.exists(os.path.join(images_dir, name)):
+            issues.append(Issue(source, int(row), "warning", f"画像ファイルが見つかりません：{IMAGES_DIRNAME}/{name}"))
+
+    df = df[keep].reset_index(drop=True)
+    df[SOURCE_COLUMN] = source
+    df[ROW_COLUMN] = line[keep.to_numpy()]
+    df[KEY_COLUMN] = [content_key(q, ch) for q, *ch in zip(df["question"], *(df[c] for c in CHOICE_COLUMNS))]
+    # 表示用文字列（LaTeX変換済み）もここで作っておく
+    return add_display_columns(df), issues, len(line)
+
+
+def assign_ids(df: pd.DataFrame, issues: list) -> pd.DataFrame:
+    """
+    check_unit の結果（複数ソースを連結したものでもよい。並びはソース順）に問題IDを割り当てる。
+      ・問題文・選択肢が前の行と同じ行は重複として除外する
+      ・id 列の値を先に確保する（同じ id を別の問題が使っていればエラーで除外）
+      ・ハッシュのIDが別の問題とぶつかったら次の空きIDを使い、警告する
+    戻り値は index が問題IDの DataFrame（コンパイル中の列は落とす）。検証結果は issues に足す。
+    """
+    sources, rows = df[SOURCE_COLUMN].tolist(), df[ROW_COLUMN].tolist()
+    explicit = df[ID_COLUMN].tolist()
+    ids = [0] * len(df)
+    keep = [True] * len(df)
+
+    def report(i: int, level: str, message: str) -> None:
+        issues.append(Issue(sources[i], int(rows[i]), level, message))
+
+    def where(i: int) -> str:
+        return f"{sources[i]}:{rows[i]}"
+
+    first = {}
+    for i, key in enumerate(df[KEY_COLUMN].tolist()):
+        if key in first:
+            report(i, "error", f"問題文・選択肢が {where(first[key])} と同じです（除外）")
+            keep[i] = False
+        else:
+            first[key] = i
+
+    owner = {}  # 問題ID → 使っている行
+    for i, qid in enumerate(explicit):
+        if not keep[i] or not qid:
+            continue
+        if qid in owner:
+            report(i, "error", f"id {qid} が {where(owner[qid])} と重複しています（除外）")
+            keep[i] = False
+        else:
+            owner[qid], ids[i] = i, qid
+    for key, i in first.items():
+        if not keep[i] or explicit[i]:
+            continue
+        qid = _key_id(key)
+        if qid in owner:
+            other = owner[qid]
+            while qid in owner:
+                qid = qid % MAX_ID + 1
+            report(i, "warning", f"問題IDが {where(other)} の別の問題とぶつかったため {qid} を使います"
+                                 "（IDを固定するには id 列を指定）")
+        owner[qid], ids[i] = i, qid
+
+    df = df[keep]
+    df.index = pd.Index([qid for qid, k in zip(ids, keep) if k], dtype=np.int64, name=ID_COLUMN)
+    return df.drop(columns=[ID_COLUMN, SOURCE_COLUMN, ROW_COLUMN, KEY_COLUMN])
+
+
+def sort_issues(issues: list, sources: list = ()) -> None:
+    """ソース順・行番号順に並べる（同じ行の中は検査順。行の無いものはそのソースの先頭）"""
+    order = {source: i for i, source in enumerate(sources)}
+    issues.sort(key=lambda i: (order.get(i.source, 0), -1 if i.row is None else i.row))
+
+
+def load_questions(unit: Unit, images_dir: str) -> tuple:
+    """
+    1単位を読み、列構成をそろえて検証する。
+    戻り値：(採用した行の DataFrame（index は問題ID）, Issue のリスト, 読んだ行数)
+    """
+    df, issues, rows = check_unit(unit, images_dir)
+    if KEY_COLUMN in df.columns:  # 必須列が無いときは列をそろえる前に返っている
+        df = assign_ids(df, issues)
+    sort_issues(issues)
+    return df, issues, rows
+
+
+def _load_unit(args: tuple) -> tuple:
+    """プロセスプール用（例外も結果として返す）"""
+    unit, images_dir = args
+    try:
+        return check_unit(unit, images_dir)
+    except Exception as e:
+        return None, [Issue(unit_label(unit), None, "error", f"読み込みに失敗しました: {e}")], 0
+
+
+# =========================
+# コンパイル
+# =========================
+def expand_units(paths: list) -> list:
+    """XLSX はシートごとに分ける"""
+    units = []
+    for path in paths:
+        if path.lower().endswith((".xlsx", ".xlsm", ".xls")):
+            with pd.ExcelFile(path) as book:
+                units.extend(Unit(path, sheet) for sheet in book.sheet_names)
+        else:
+            units.append(Unit(path, None))
+    return units
+
+
+def build_bank(paths: list, bank_path: str, images_dir: str = None, jobs: int = 1) -> tuple:
+    """
+    ソース群からバンクの (header, payload, issues) を作る。
+    jobs > 1 ならファイル・シートごとにプロセスプールで並列に読む。
+    """
+    bank_dir = os.path.dirname(os.path.abspath(bank_path))
+    images_dir = images_dir or os.path.join(bank_dir, IMAGES_DIRNAME)
+    digest = sources_digest(paths)
+    units = expand_units(paths)
+
+    tasks = [(unit, images_dir) for unit in units]
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+            results = list(pool.map(_load_unit, tasks))
+    else:
+        results = [_load_unit(t) for t in tasks]
+
+    # 問題IDはソースの内容から決まる（ソース・行の並び順が変わっても同じ問題は同じID）。
+    # ソースをまたいだ重複・衝突も見るため、全ソースをソース順に連結してから割り当てる
+    frames, issues = [], []
+    for df, unit_issues, _ in results:
+        issues.extend(unit_issues)
+        if df is not None and not df.empty:
+            frames.append(df)
+    if not frames:
+        raise ValueError("問題が1件もありません: " + ", ".join(paths))
+    df = assign_ids(pd.concat(frames, ignore_index=True), issues)
+    sort_issues(issues, [unit_label(unit) for unit in units])
+
+    columns = REQUIRED_COLUMNS + OPTIONAL_COLUMNS
+    df = df[columns + [c for c in df.columns if c not in columns]]
+    df = df.fillna({c: "" for c in df.columns if c not in NUMERIC_COLUMNS})
+
+    header = {
+        "format": BANK_FORMAT,
+        "sources": [
+            {"path": os.path.relpath(os.path.abspath(p), bank_dir), "sha256": file_sha256(p)}
+            for p in paths
+        ],
+        "source_sha256": digest,
+        "built_at": time.time(),
+        "rows": len(df),
+        # 検証結果（アプリの管理画面で見せる。compiler を import せずに読めるようタプルで持つ）
+        "issues": [tuple(issue) for issue in issues],
+    }
+    payload = {
+        "ids": df.index.to_numpy(),
+        "columns": {c: df[c].tolist() for c in df.columns},
+    }
+    return header, payload, issues
+
+
+def print_report(issues: list, file=sys.stdout) -> None:
+    for issue in issues:
+        where = issue.source if issue.row is None else f"{issue.source}:{issue.row}"
+        print(f"{where}\t{issue.level}\t{issue.message}", file=file)
+    errors = sum(1 for i in issues if i.level == "error")
+    print(f"エラー {errors} 件 / 警告 {len(issues) - errors} 件", file=file)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m spi_core.compiler",
+        description="CSV / XLSX の問題をまとめて検証し、アプリが読むバンクファイルを作る",
+    )
+    parser.add_argument("sources", nargs="+", help="CSV / XLSX ファイル（XLSXは全シート）")
+    parser.add_argument("-o", "--output", default="spi_questions.bank", help="出力するバンクファイル")
+    parser.add_argument("--images-dir", default=None, help=f"画像フォルダ（既定：出力先の {IMAGES_DIRNAME}/）")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="並列プロセス数")
+    parser.add_argument("--report", default=None, help="検証結果をCSVにも書き出す")
+    parser.add_argument("--strict", action="store_true", help="エラーが1件でもあればバンクを書き出さない")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    try:
+        header, payload, issues = build_bank(args.sources, args.output, args.images_dir, args.jobs)
+    except (OSError, ValueError, ImportError) as e:
+        print(f"コンパイルに失敗しました: {e}", file=sys.stderr)
+        return 1
+
+    print_report(issues)
+    if args.report:
+        pd.DataFrame(issues, columns=Issue._fields).to_csv(args.report, index=False, encoding="utf-8")
+    if args.strict and any(i.level == "error" for i in issues):
+        print("--strict のためバンクは書き出しません", file=sys.stderr)
+        return 1
+
+    write_bank(args.output, header, payload)
+    print(f"{header['rows']} 問 → {args.output}（{time.perf_counter() - t0:.2f} 秒）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+表示用文字列の前計算：
+  読込時に question / choice1〜5 / explanation から *_md 列を一度だけ作り、
+  描画時は列を参照するだけにする（再実行のたびに re.sub を回さない）
+"""
+import re
+from functools import lru_cache
+
+import pandas as pd
+
+DISPLAY_FIELDS = ["question", "choice1", "choice2", "choice3", "choice4", "choice5", "explanation"]
+
+# auto_math_to_latex と同じ規則を同じ順序で（ルート変換が先、分数変換が最後）
+MATH_RULES = [
+    (re.compile(r'\bsqrt\s*\(\s*([^)]+?)\s*\)'), r'$\\sqrt{\1}$'),
+    (re.compile(r'ルート\s*\(\s*([^)]+?)\s*\)'), r'$\\sqrt{\1}$'),
+    (re.compile(r'ルート\s*([0-9A-Za-z]+)'), r'$\\sqrt{\1}$'),
+    (re.compile(r'√\s*\(\s*([^)]+?)\s*\)'), r'$\\sqrt{\1}$'),
+    (re.compile(r'√\s*([0-9A-Za-z]+)'), r'$\\sqrt{\1}$'),
+    # 数字/数字 のみ縦分数へ（誤変換を避ける）
+    (re.compile(r'(?<!\d)(\d+)\s*/\s*(\d+)(?!\d)'), r'$\\frac{\1}{\2}$'),
+]
+
+# ルート表記の種類（2種類以上が混ざる文字列は、規則どうしの重なり方が変わりうるので順に当てる）
+SQRT_WORDS = ("sqrt", "ルート", "√")
+# 半角数字の直後の全角などの数字：「√1」の置換後に続く「１/2」は、順に当てると直前が "$" になって分数に
+# 変換されるが、1回の走査では分数の (?<!\d) が置換前の "1" を見てしまう。こういう文字列も順に当てる
+_DIGIT_BEFORE_WIDE_DIGIT = re.compile(r"[0-9](?![0-9])\d")
+MATH_CACHE_SIZE = 8192
+
+
+def _compile_pass(rules: list) -> tuple:
+    """
+    規則の並びを1つの正規表現にまとめる（同じ位置なら規則の順に試す）。
+    各規則を外側のグループで包み、どの規則に当たったかは lastindex で引く。
+    """
+    parts, index, pos = [], {}, 1
+    for k, (pattern, repl) in enumerate(rules):
+        parts.append(f"({pattern.pattern})")
+        pieces = re.split(r"\\(\d)", repl)
+        literals = [piece.replace("\\\\", "\\") for piece in pieces[0::2]]
+        groups = [pos + int(g) for g in pieces[1::2]]
+        index[pos] = (k, literals, groups)
+        pos += pattern.groups + 1
+    return re.compile("|".join(parts)), index
+
+
+# _PASSES[k]：k 番目以降の規則をまとめたもの
+_PASSES = [_compile_pass(MATH_RULES[k:]) for k in range(len(MATH_RULES))]
+
+
+def safe_str(x) -> str:
+    """None/NaN対策 + 前後空白除去 + ダブルクォート除去（表示で " が残らないように）"""
+    if x is None:
+        return ""
+    s = str(x).strip()
+    if s.lower() in ("nan", "none"):
+        return ""
+    # ★ CSVに "1/3" のように入っていても画面表示では " を消す
+    s = s.replace('"', "")
+    return s
+
+
+def apply_math_rules(s: str) -> str:
+    """MATH_RULES を1つずつ順に当てる（基準の実装。ルート表記が混ざる文字列はこちらで変換する）"""
+    for pattern, repl in MATH_RULES:
+        s = pattern.sub(repl, s)
+    return s
+
+
+def _single_pass(s: str, start: int = 0) -> str:
+    """
+    MATH_RULES[start:] を1回の走査で当てる。
+    順に当てた場合は、先の規則の置換結果（\\sqrt{...} の中身）にも後の規則がかかるので、
+    置換するグループの中身にはそれより後の規則だけを当てる。
+    """
+    if start >= len(MATH_RULES):
+        return s
+    regex, index = _PASSES[start]
+
+    def repl(m: re.Match) -> str:
+        k, literals, groups = index[m.lastindex]
+        out = [literals[0]]
+        for g, literal in zip(groups, literals[1:]):
+            out.append(_single_pass(m.group(g), start + k + 1))
+            out.append(literal)
+        return "".join(out)
+
+    return regex.sub(repl, s)
+
+
+@lru_cache(maxsize=MATH_CACHE_SIZE)
+def convert_math(s: str) -> str:
+    """safe_str 済みの文字列を変換する（同じ選択肢などは何度も出るので LRU で覚えておく）"""
+    # すでに数式/LaTeXなら触らない（安全側）
+    if "$" in s or "\\frac" in s or "\\sqrt" in s:
+        return s
+    if sum(word in s for word in SQRT_WORDS) > 1 or _DIGIT_BEFORE_WIDE_DIGIT.search(s):
+        return apply_math_rules(s)
+    return _single_pass(s)
+
+
+def auto_math_to_latex(text: str) -> str:
+    """
+    表示用の自動変換：
+      1/2 -> $\\frac{1}{2}$（縦分数）
+      √2, √(a+b), ルート3, sqrt(5) -> $\\sqrt{...}$
+    """
+    if not text:
+        return ""
+    return convert_math(safe_str(text))
+
+
+def clean_series(col: pd.Series) -> pd.Series:
+    """safe_str の列版"""
+    s = col.astype(str).str.strip()
+    s = s.mask(s.str.lower().isin(["nan", "none"]), "")
+    return s.str.replace('"', "", regex=False)
+
+
+def math_to_latex_series(col: pd.Series) -> pd.Series:
+    """auto_math_to_latex(safe_str(x)) の列版（safe_str が2回かかる点も含めて同じ結果）"""
+    return clean_series(clean_series(col)).map(convert_math, na_action="ignore")
+
+
+def add_display_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """question_md / choice1_md〜choice5_md / explanation_md を追加する"""
+    for c in DISPLAY_FIELDS:
+        df[f"{c}_md"] = math_to_latex_series(df[c])
+    return df
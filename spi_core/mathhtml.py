@@ -0,0 +1,95 @@
+"""
+数式の事前描画（任意）：
+  *_md の $\\frac{..}{..}$ / $\\sqrt{..}$ を、サーバー側で一度だけ静的な HTML（インラインの CSS）にする。
+  ブラウザは KaTeX での組版をしなくてよいので、結果画面など数式の多いページが軽くなる。
+  変換できるのは auto_math_to_latex が作る \\frac と \\sqrt だけで、ほかの数式はそのまま残す（ブラウザで組版）。
+  表示側は unsafe_allow_html=True で描画するため、数式以外の本文の < > & はエスケープする。
+"""
+import html
+import re
+from functools import lru_cache
+
+from spi_core.question import Question
+
+MATH_CACHE_SIZE = 8192
+QUESTION_CACHE_SIZE = 4096
+
+FRAC_HTML = (
+    '<span style="display:inline-flex;flex-direction:column;vertical-align:middle;text-align:center;'
+    'font-size:0.9em;line-height:1.2;margin:0 0.1em">'
+    '<span style="padding:0 0.15em;border-bottom:1px solid currentColor">{}</span>'
+    '<span style="padding:0 0.15em">{}</span></span>'
+)
+SQRT_HTML = ('<span style="white-space:nowrap">√<span style="border-top:1px solid currentColor;'
+             'padding:0 0.1em">{}</span></span>')
+
+MATH_FRAGMENT = re.compile(r"\$([^$]+)\$")
+TEX_TOKEN = re.compile(r"\\frac\s*\{|\\sqrt\s*\{|\{|\}|\\|[^\\{}]+")
+# 数式の中身が Markdown として解釈されないように
+MARKDOWN_CHARS = str.maketrans({c: f"&#{ord(c)};" for c in "*_`[]~"})
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def _parse(tokens: list, pos: int, closing: bool) -> tuple:
+    """tokens[pos:] を } まで（closing=False なら最後まで）HTML にする → (html, 次の位置)"""
+    out = []
+    while pos < len(tokens):
+        tok = tokens[pos]
+        pos += 1
+        if tok == "}":
+            if closing:
+                return "".join(out), pos
+            raise _Unsupported
+        if tok.startswith("\\frac"):
+            num, pos = _parse(tokens, pos, True)
+            if pos >= len(tokens) or tokens[pos] != "{":
+                raise _Unsupported
+            den, pos = _parse(tokens, pos + 1, True)
+            out.append(FRAC_HTML.format(num, den))
+        elif tok.startswith("\\sqrt"):
+            body, pos = _parse(tokens, pos, True)
+            out.append(SQRT_HTML.format(body))
+        elif tok == "{":
+            body, pos = _parse(tokens, pos, True)
+            out.append(body)
+        elif tok == "\\":
+            raise _Unsupported  # \frac / \sqrt 以外のコマンド
+        else:
+            out.append(html.escape(tok, quote=False).translate(MARKDOWN_CHARS))
+    if closing:
+        raise _Unsupported
+    return "".join(out), pos
+
+
+@lru_cache(maxsize=MATH_CACHE_SIZE)
+def render_tex(tex: str):
+    """$ の中身 → HTML（\\frac / \\sqrt 以外を含むときは None）。断片の文字列ごとに覚えておく"""
+    try:
+        return _parse(TEX_TOKEN.findall(tex), 0, False)[0]
+    except _Unsupported:
+        return None
+
+
+def prerender_markdown(md: str) -> str:
+    """Markdown 中の $...$ を HTML にし、それ以外はエスケープする（変換できない断片は $...$ のまま）"""
+    out, pos = [], 0
+    for m in MATH_FRAGMENT.finditer(md):
+        out.append(html.escape(md[pos:m.start()], quote=False))
+        rendered = render_tex(m.group(1))
+        out.append(m.group(0) if rendered is None else rendered)
+        pos = m.end()
+    out.append(html.escape(md[pos:], quote=False))
+    return "".join(out)
+
+
+@lru_cache(maxsize=QUESTION_CACHE_SIZE)
+def prerender_question(q: Question) -> Question:
+    """表示用の文字列（問題文・選択肢・解説）を事前描画した Question（初めて表示したときに1回だけ作る）"""
+    return Question(
+        q.id, q.category, q.text, prerender_markdown(q.question),
+        tuple(prerender_markdown(c) for c in q.choices), q.answer,
+        prerender_markdown(q.explanation), q.image, q.time_limit,
+    )
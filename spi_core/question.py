@@ -0,0 +1,58 @@
+"""
+描画用の問題レコード：
+  バンクを読んだときに1問ずつ1回だけ作り、描画側はこの属性を読むだけにする。
+  文字列はコンパイル時に掃除・表示用に変換済み（*_md）、正解は 0〜4 の整数、画像は ImageAssets が引くキー。
+"""
+CHOICE_COUNT = 5
+
+
+class Question:
+    """1問分の不変レコード（__slots__ でインスタンス辞書を持たない）"""
+
+    __slots__ = ("id", "category", "text", "question", "choices", "answer", "explanation", "image",
+                 "time_limit")
+
+    def __init__(self, id: int, category: str, text: str, question: str, choices: tuple, answer: int,
+                 explanation: str, image, time_limit: float):
+        setattr_ = object.__setattr__
+        setattr_(self, "id", id)                     # 問題ID（id 列の値か、問題文・選択肢のハッシュ）
+        setattr_(self, "category", category)
+        setattr_(self, "text", text)                 # 元の問題文（一覧のプレビュー用）
+        setattr_(self, "question", question)         # 表示用（LaTeX変換済み）
+        setattr_(self, "choices", choices)           # 表示用の選択肢 A〜E
+        setattr_(self, "answer", answer)             # 0〜4（不明は -1）
+        setattr_(self, "explanation", explanation)   # 表示用
+        setattr_(self, "image", image)               # (image_url, image)、画像なしは None
+        setattr_(self, "time_limit", time_limit)     # 秒（設定なしは NaN）
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Question は変更できません")
+
+    def __delattr__(self, name):
+        raise AttributeError("Question は変更できません")
+
+    def __reduce__(self):
+        # 復元時も __init__ を通す（__setattr__ を塞いでいるため）
+        return Question, tuple(getattr(self, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"Question(id={self.id}, category={self.category!r}, text={self.text[:20]!r})"
+
+
+def build_questions(ids, columns: dict, answer_index, time_limit) -> tuple:
+    """列ごとのタプル（ストアの中身）から、位置順の Question のタプルを作る"""
+    n = len(ids)
+    blank = ("",) * n
+
+    def col(name: str) -> tuple:
+        return columns.get(name, blank)
+
+    choices = zip(*(col(f"choice{i + 1}_md") for i in range(CHOICE_COUNT)))
+    images = [None if key == ("", "") else key for key in zip(col("image_url"), col("image"))]
+    return tuple(
+        Question(int(qid), category, text, question, tuple(ch), int(answer), explanation, image, float(limit))
+        for qid, category, text, question, ch, answer, explanation, image, limit in zip(
+            ids, col("category"), col("question"), col("question_md"), choices, answer_index,
+            col("explanation_md"), images, time_limit,
+        )
+    )
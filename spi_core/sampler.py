@@ -0,0 +1,68 @@
+"""
+出題のサンプリング：
+  カテゴリ → 問題ID配列 の索引を読込時に一度だけ作り、
+  開始ボタンでは索引から非復元抽出するだけにする（毎回DataFrameを絞り込まない）
+"""
+import numpy as np
+
+_rng = np.random.default_rng()
+
+
+class InsufficientQuestions(ValueError):
+    """カテゴリの問題数が出題数に足りない"""
+
+    def __init__(self, category: str, need: int, have: int):
+        super().__init__(f"カテゴリ「{category}」の問題数が不足しています（必要{need}問 / 現在{have}問）")
+        self.category = category
+        self.need = need
+        self.have = have
+
+
+def build_category_index(ids: np.ndarray, categories) -> dict:
+    """カテゴリ名 → 問題ID（int32、読み取り専用）の対応表"""
+    ids = np.asarray(ids, dtype=np.int32)
+    # カテゴリ名を出現順に 0,1,2... へ符号化（文字列のソートはしない）
+    codes = {}
+    inverse = np.fromiter((codes.setdefault(c, len(codes)) for c in categories), dtype=np.int32, count=len(ids))
+    order = np.argsort(inverse, kind="stable")
+    bounds = np.cumsum(np.bincount(inverse, minlength=len(codes)))[:-1]
+    index = {}
+    for name, part in zip(codes, np.split(ids[order], bounds)):
+        part.flags.writeable = False
+        index[str(name)] = part
+    return index
+
+
+def sample_ids(index: dict, category: str, n: int, rng=None) -> np.ndarray:
+    """1カテゴリから n 問を非復元抽出"""
+    pool = index.get(category)
+    have = 0 if pool is None else len(pool)
+    if have < n:
+        raise InsufficientQuestions(category, n, have)
+    return (rng or _rng).choice(pool, size=n, replace=False).astype(np.int32, copy=False)
+
+
+def allocate(ratio: dict, n: int) -> dict:
+    """出題数 n を比率どおりに各カテゴリへ割り振る（最大剰余法、合計は必ず n）"""
+    weights = np.asarray(list(ratio.values()), dtype=float)
+    exact = weights / weights.sum() * n
+    counts = np.floor(exact).astype(int)
+    rest = n - counts.sum()
+    if rest:
+        counts[np.argsort(counts - exact, kind="stable")[:rest]] += 1
+    return dict(zip(ratio, counts.tolist()))
+
+
+def sample_mock_exam(index: dict, ratio: dict, n: int, rng=None) -> np.ndarray:
+    """
+    模擬試験モード：複数カテゴリから決まった比率で n 問を1回で抽出。
+    出題順はカテゴリ順（例：言語 → 非言語）で、カテゴリ内はランダム。
+    """
+    counts = allocate(ratio, n)
+    # 足りないカテゴリがあれば抽出前にまとめてエラー
+    for cat, k in counts.items():
+        have = len(index.get(cat, ()))
+        if have < k:
+            raise InsufficientQuestions(cat, k, have)
+    parts = [sample_ids(index, cat, k, rng) for cat, k in counts.items() if k]
+    return np.concatenate(parts) if parts else np.empty(0, dtype=np.int32)
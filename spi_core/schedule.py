@@ -0,0 +1,40 @@
+"""
+制限時間のスケジュール：
+  開始ボタンの時点で、出題順の制限時間（秒）と試験全体の締切時刻を決めておく。
+  各問の締切時刻は1回だけ決めて保存し（試験全体モードでは開始時に全問分）、
+  時間切れの判定は「現在時刻 >= 締切時刻」の比較1回で済ませる。
+"""
+import math
+
+import numpy as np
+
+# 試験全体の締切なし
+NO_DEADLINE = math.inf
+
+PER_QUESTION = "1問ごと"
+WHOLE_EXAM = "試験全体"
+TIME_MODES = [PER_QUESTION, WHOLE_EXAM]
+
+
+def question_limits(store, question_ids: np.ndarray, default: float) -> np.ndarray:
+    """出題順の制限時間（秒）：問題の time_limit、設定が無ければ default"""
+    limits = store.time_limit[store.positions(question_ids)].astype(np.float64)
+    return np.where(np.isnan(limits), float(default), limits)
+
+
+def build_deadlines(start: float, limits: np.ndarray, time_mode: str, budget: float = 0) -> tuple:
+    """
+    (各問の締切時刻の配列, 試験全体の締切時刻) を作る。
+      1問ごと：各問の締切は表示したときに決まるので NaN のまま、試験の締切なし
+      試験全体：全問の締切 = start + budget 秒（budget が 0 なら各問の制限時間の合計）
+    """
+    if time_mode == WHOLE_EXAM:
+        exam_deadline = start + (budget or float(limits.sum()))
+        return np.full(len(limits), exam_deadline), exam_deadline
+    return np.full(len(limits), np.nan), NO_DEADLINE
+
+
+def format_seconds(seconds: float) -> str:
+    """残り時間の表示（60秒以上は「分秒」）"""
+    s = int(seconds)
+    return f"{s // 60}分{s % 60:02d}秒" if s >= 60 else f"{s}秒"
@@ -0,0 +1,105 @@
+"""
+採点・集計：
+  回答は int8（0〜4 = A〜E、-1 = 未回答）で持ち、NumPy 配列のまま一度に集計する。
+  1セッションの採点は score_session()、保存済みの大量の回答の集計は tally() で一括して行う。
+"""
+from collections import namedtuple
+
+import numpy as np
+
+NO_ANSWER = -1
+ANSWER_LETTERS = ["a", "b", "c", "d", "e"]
+ANSWER_LABELS = ["A", "B", "C", "D", "E"]
+
+# 1セッション分
+Score = namedtuple("Score", [
+    "total",              # 正解数
+    "count",              # 出題数
+    "correct",            # 問題ごとの正誤（bool）
+    "elapsed",            # 問題ごとの所要秒数（未到達は NaN）
+    "timeouts",           # 時間切れの数
+    "category_attempts",  # カテゴリごとの回答数（時間切れを含む）
+    "category_correct",   # カテゴリごとの正解数
+])
+
+# 複数セッション分（attempt = 1セッション、record = 1問への回答）
+Tally = namedtuple("Tally", [
+    "attempt_total",      # セッションごとの正解数
+    "attempt_count",      # セッションごとの回答数
+    "question_attempts",  # 問題（ストア上の位置）ごとの回答数
+    "question_correct",
+    "question_timeouts",
+    "question_seconds",   # 問題ごとの所要秒数の合計（平均は / question_attempts）
+    "category_attempts",
+    "category_correct",
+    "category_timeouts",
+    "unknown",            # ストアに無い問題（削除した問題・旧形式のID）への回答で、集計しなかった数
+])
+
+
+def tally(store, attempt_index: np.ndarray, question_ids: np.ndarray, answers: np.ndarray,
+          elapsed: np.ndarray, n_attempts: int) -> Tally:
+    """
+    回答レコードをまとめて集計する（Python のループなし）。
+      attempt_index: レコードが属するセッション番号（0〜n_attempts-1）
+      answers      : int8（-1 = 時間切れ）
+      elapsed      : 所要秒数
+    ストアに無い問題IDのレコードはどこにも数えず、件数だけ unknown で返す。
+    """
+    pos = store.positions(question_ids)
+    known = pos >= 0
+    unknown = int(len(pos) - np.count_nonzero(known))
+    if unknown:
+        pos = pos[known]
+        attempt_index = np.asarray(attempt_index)[known]
+        answers = np.asarray(answers)[known]
+        elapsed = np.asarray(elapsed)[known]
+    answers = np.asarray(answers, dtype=np.int8)
+    correct = (answers >= 0) & (answers == store.answer_index[pos])
+    timeout = answers == NO_ANSWER
+    cats = store.category_code[pos]
+    n_questions = len(store)
+    n_categories = len(store.category_names)
+
+    def count(keys, weights, n):
+        return np.bincount(keys, weights=weights, minlength=n)
+
+    return Tally(
+        attempt_total=count(attempt_index, correct, n_attempts).astype(np.int64),
+        attempt_count=count(attempt_index, None, n_attempts).astype(np.int64),
+        question_attempts=count(pos, None, n_questions).astype(np.int64),
+        question_correct=count(pos, correct, n_questions).astype(np.int64),
+        question_timeouts=count(pos, timeout, n_questions).astype(np.int64),
+        question_seconds=count(pos, np.nan_to_num(elapsed), n_questions),
+        category_attempts=count(cats, None, n_categories).astype(np.int64),
+        category_correct=count(cats, correct, n_categories).astype(np.int64),
+        category_timeouts=count(cats, timeout, n_categories).astype(np.int64),
+        unknown=unknown,
+    )
+
+
+def score_session(store, question_ids: np.ndarray, answers: np.ndarray,
+                  start_times: np.ndarray, end_times: np.ndarray) -> Score:
+    """1セッションの採点（end_times が NaN の問題は未到達として数えない）"""
+    answers = np.asarray(answers, dtype=np.int8)
+    done = ~np.isnan(end_times)
+    pos = store.positions(question_ids)
+    correct = (answers >= 0) & (answers == store.answer_index[pos])
+    cats = store.category_code[pos]
+    n_categories = len(store.category_names)
+
+    return Score(
+        total=int(correct.sum()),
+        count=len(question_ids),
+        correct=correct,
+        elapsed=end_times - start_times,
+        timeouts=int((done & (answers == NO_ANSWER)).sum()),
+        category_attempts=np.bincount(cats[done], minlength=n_categories),
+        category_correct=np.bincount(cats[correct], minlength=n_categories),
+    )
+
+
+def accuracy(correct: np.ndarray, attempts: np.ndarray) -> np.ndarray:
+    """正答率（回答 0 件は NaN）"""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(attempts > 0, correct / attempts, np.nan)
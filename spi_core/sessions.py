@@ -0,0 +1,228 @@
+"""
+セッションの保存先：
+  クイズの進行状況（出題ID・回答・時刻などの配列と数個の値）をセッショントークンごとに保存し、
+  再接続したとき・別のワーカープロセスにつながったときに、トークンから同じ状態を復元する。
+  保存する形式は spi_core.checkpoint の固定形式のバイト列（50問で約1KB）。
+  保存先は差し替えられる（SessionBackend を継承して load / save / delete を実装する）。
+
+  MemorySessionBackend : プロセス内の辞書（再起動や別プロセスでは再開できない）
+  SQLiteSessionBackend : ローカルの SQLite ファイル（同じマシンの複数プロセスで共有できる）
+
+  SessionManager : プロセス内のセッションの使用状況を記録し、しばらく使われていないもの・
+                   メモリの上限を超えた分を、保存してからメモリから追い出す（次の操作で保存から戻す）
+"""
+import logging
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from spi_core.checkpoint import decode_checkpoint, encode_checkpoint
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    token      TEXT PRIMARY KEY,
+    updated_at REAL NOT NULL,   -- time.time()
+    state      BLOB NOT NULL
+);
+"""
+
+
+def decode_or_none(data: bytes):
+    """読めない（壊れた・古い形式の）チェックポイントは、保存が無いのと同じ扱いにする"""
+    try:
+        return decode_checkpoint(data)
+    except ValueError as e:
+        logger.warning("セッションを復元できませんでした: %s", e)
+        return None
+
+
+class SessionBackend:
+    """セッションの保存先（状態は dict で受け渡し、保存の形式は実装に任せる）"""
+
+    def load(self, token: str):
+        """保存された状態（無ければ None）"""
+        raise NotImplementedError
+
+    def save(self, token: str, state: dict) -> None:
+        raise NotImplementedError
+
+    def delete(self, token: str) -> None:
+        raise NotImplementedError
+
+    def purge(self, before: float) -> int:
+        """before（time.time()）より前に保存したきりのものを消す（消した件数）"""
+        raise NotImplementedError
+
+
+class MemorySessionBackend(SessionBackend):
+    """プロセス内に持つだけの保存先（1プロセスで動かすとき用）"""
+
+    def __init__(self):
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def load(self, token: str):
+        with self._lock:
+            saved = self._states.get(token)
+        return None if saved is None else decode_or_none(saved[1])
+
+    def save(self, token: str, state: dict) -> None:
+        data = encode_checkpoint(state)  # 呼び出し側が配列を書き換えても保存した内容は変わらない
+        with self._lock:
+            self._states[token] = (time.time(), data)
+
+    def delete(self, token: str) -> None:
+        with self._lock:
+            self._states.pop(token, None)
+
+    def purge(self, before: float) -> int:
+        with self._lock:
+            old = [token for token, (saved_at, _) in self._states.items() if saved_at < before]
+            for token in old:
+                del self._states[token]
+        return len(old)
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """
+    SQLite に保存する（WAL なので複数プロセスから読み書きしても読み手を止めない）。
+    保存は回答・次へ・開始のたびに1行を書き換えるだけで、書き込みが失敗してもクイズは止めない。
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.last_error = None
+        # 接続はプロセスで1つをロックで共有する（Streamlit は再実行のたびに新しいスレッドで
+        # スクリプトを動かすので、スレッドごとに持つと毎回つなぎ直して PRAGMA を流すことになる）
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def load(self, token: str):
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT state FROM sessions WHERE token = ?", (token,)).fetchone()
+        except sqlite3.Error as e:
+            self.last_error = e
+            logger.warning("セッションを読み込めませんでした: %s", e)
+            return None
+        return None if row is None else decode_or_none(row[0])
+
+    def save(self, token: str, state: dict) -> None:
+        data = encode_checkpoint(state)
+        try:
+            with self._lock, self._conn as conn:
+                conn.execute("INSERT OR REPLACE INTO sessions (token, updated_at, state) VALUES (?, ?, ?)",
+                             (token, time.time(), data))
+        except sqlite3.Error as e:
+            self.last_error = e
+            logger.warning("セッションを保存できませんでした: %s", e)
+
+    def delete(self, token: str) -> None:
+        try:
+            with self._lock, self._conn as conn:
+                conn.execute("DELETE FROM sessions WHERE token = ?", (token,))
+        except sqlite3.Error as e:
+            self.last_error = e
+            logger.warning("セッションを削除できませんでした: %s", e)
+
+    def purge(self, before: float) -> int:
+        try:
+            with self._lock, self._conn as conn:
+                return conn.execute("DELETE FROM sessions WHERE updated_at < ?", (before,)).rowcount
+        except sqlite3.Error as e:
+            self.last_error = e
+            logger.warning("古いセッションを削除できませんでした: %s", e)
+            return 0
+
+
+# 使用状況：sessions = メモリ上のセッション数、bytes = その状態の合計バイト数、evicted = 追い出した累計
+SessionStats = namedtuple("SessionStats", ["sessions", "bytes", "evicted"])
+
+
+class SessionManager:
+    """
+    プロセスで1つだけ作り、各セッションが操作のたびに touch() する。裏のスレッドが定期的に sweep() して
+      - idle_ttl 秒より長く使われていないセッション
+      - 合計が max_bytes を超えたとき、使われていない時間の長いものから（min_idle 秒以内に使ったものは除く）
+    を release(state) で追い出す（呼び出し側が保存してから状態を消す）。sizeof(state) は状態のバイト数。
+    保存先を渡せば、checkpoint_ttl 秒より古い保存も消す（長く動かしてもファイル・メモリが増え続けない）。
+    """
+
+    def __init__(self, sizeof, release, idle_ttl: float = 1800.0, max_bytes: int = 64 << 20,
+                 min_idle: float = 60.0, sweep_interval: float = 30.0, backend: SessionBackend = None,
+                 checkpoint_ttl: float = 7 * 86400.0):
+        self.sizeof = sizeof
+        self.release = release
+        self.idle_ttl = idle_ttl
+        self.max_bytes = max_bytes
+        self.min_idle = min_idle
+        self.backend = backend
+        self.checkpoint_ttl = checkpoint_ttl
+        self.evicted = 0
+        self._sessions = {}  # キー → [最後に使った時刻, 状態]
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(sweep_interval,), name="spi-session-sweep",
+                                        daemon=True)
+        self._thread.start()
+
+    def touch(self, key: str, state) -> None:
+        """このセッションを今使った（追い出しと同じロックの下で記録するので、使用中に追い出されない）"""
+        with self._lock:
+            self._sessions[key] = [time.time(), state]
+
+    def _sizes(self) -> dict:
+        sizes = {}
+        for key, (_, state) in self._sessions.items():
+            try:
+                sizes[key] = self.sizeof(state)
+            except Exception:
+                sizes[key] = 0
+        return sizes
+
+    def sweep(self, now: float = None) -> int:
+        """追い出しを1回行う（追い出した件数）"""
+        now = time.time() if now is None else now
+        evicted = 0
+        with self._lock:
+            sizes = self._sizes()
+            total = sum(sizes.values())
+            # 使われていない時間の長い順
+            for key, (last_seen, state) in sorted(self._sessions.items(), key=lambda item: item[1][0]):
+                idle = now - last_seen
+                if idle < self.idle_ttl and (total <= self.max_bytes or idle < self.min_idle):
+                    continue
+                try:
+                    self.release(state)
+                except Exception as e:
+                    logger.warning("セッションを追い出せませんでした: %s", e)
+                del self._sessions[key]
+                total -= sizes[key]
+                evicted += 1
+            self.evicted += evicted
+        if self.backend is not None and now - self._last_purge >= min(self.checkpoint_ttl, 3600.0):
+            self._last_purge = now
+            self.backend.purge(now - self.checkpoint_ttl)
+        return evicted
+
+    def stats(self) -> SessionStats:
+        with self._lock:
+            return SessionStats(len(self._sessions), sum(self._sizes().values()), self.evicted)
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.warning("セッションの追い出しに失敗しました: %s", e)
@@ -0,0 +1,120 @@
+"""
+問題別・カテゴリ別の集計：
+  回答ログの書き込みと同じトランザクションで、集計テーブルのカウンタを加算していく。
+  管理画面は集計テーブル（問題数ぶんの行）だけを読むので、回答が何件あっても読む量は変わらない。
+  問題IDはコンパイラが内容（または id 列）から決めたものなので、CSV に行を足し引きしても別の問題に付け替わらない。
+"""
+import sqlite3
+from collections import namedtuple
+
+import numpy as np
+
+# 所要秒数のヒストグラム：[0,5) [5,10) [10,20) [20,30) [30,60) [60,120) [120,∞)
+HIST_EDGES = (5, 10, 20, 30, 60, 120)
+HIST_COLUMNS = [f"h{i}" for i in range(len(HIST_EDGES) + 1)]
+HIST_LABELS = ["<5秒", "5-10秒", "10-20秒", "20-30秒", "30-60秒", "60-120秒", "120秒+"]
+COUNTER_COLUMNS = ["attempts", "correct", "timeouts", "seconds"] + HIST_COLUMNS
+# ログの question_id の形式（PRAGMA user_version）：0 = 旧形式（ソースの行番号）、1 = 内容から決めたID
+ID_VERSION = 1
+
+_counters = ",\n    ".join(
+    f"{c} {'REAL' if c == 'seconds' else 'INTEGER'} NOT NULL DEFAULT 0" for c in COUNTER_COLUMNS
+)
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS question_stats (
+    question_id INTEGER PRIMARY KEY,
+    {_counters}
+);
+CREATE TABLE IF NOT EXISTS category_stats (
+    category TEXT PRIMARY KEY,
+    {_counters}
+);
+"""
+
+
+def _upsert(table: str, key: str) -> str:
+    cols = [key] + COUNTER_COLUMNS
+    updates = ", ".join(f"{c} = {c} + excluded.{c}" for c in COUNTER_COLUMNS)
+    return (f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))}) "
+            f"ON CONFLICT({key}) DO UPDATE SET {updates}")
+
+
+UPSERT_QUESTION = _upsert("question_stats", "question_id")
+UPSERT_CATEGORY = _upsert("category_stats", "category")
+
+# 読み出し結果（各フィールドはキー順の配列、hist は (件数, バケット数)）
+Stats = namedtuple("Stats", ["keys", "attempts", "correct", "timeouts", "seconds", "hist"])
+
+
+def _deltas(keys: np.ndarray, correct: np.ndarray, timeout: np.ndarray, elapsed: np.ndarray) -> list:
+    """バッチ内の回答をキーごとに足し合わせ、UPSERT の引数にする"""
+    uniq, inv = np.unique(keys, return_inverse=True)
+    n = len(uniq)
+    bucket = np.searchsorted(HIST_EDGES, elapsed, side="right")
+    hist = np.zeros((n, len(HIST_COLUMNS)), dtype=np.int64)
+    np.add.at(hist, (inv, bucket), 1)
+    counters = np.column_stack([
+        np.bincount(inv, minlength=n),
+        np.bincount(inv, weights=correct, minlength=n),
+        np.bincount(inv, weights=timeout, minlength=n),
+    ]).astype(np.int64)
+    seconds = np.bincount(inv, weights=elapsed, minlength=n)
+    return [
+        (key.item() if hasattr(key, "item") else key, *map(int, c), float(s), *map(int, h))
+        for key, c, s, h in zip(uniq, counters, seconds, hist)
+    ]
+
+
+def apply_batch(conn: sqlite3.Connection, rows: list) -> None:
+    """
+    回答ログの1バッチ分を集計テーブルに加算する（呼び出し側のトランザクション内で実行）。
+    rows: (answered_at, session_id, question_id, choice, correct, elapsed, category)
+    """
+    _, _, qids, choices, correct, elapsed, categories = zip(*rows)
+    correct = np.asarray(correct, dtype=np.int64)
+    timeout = (np.asarray(choices) < 0).astype(np.int64)
+    elapsed = np.nan_to_num(np.asarray(elapsed, dtype=float))
+    conn.executemany(UPSERT_QUESTION, _deltas(np.asarray(qids, dtype=np.int64), correct, timeout, elapsed))
+    conn.executemany(UPSERT_CATEGORY, _deltas(np.asarray(categories, dtype=object), correct, timeout, elapsed))
+
+
+def rebuild(conn: sqlite3.Connection) -> None:
+    """回答ログ全体から集計テーブルを作り直す（集計テーブル導入前のログの取り込み用）"""
+    elapsed = "COALESCE(elapsed, 0)"
+    bounds = (None,) + HIST_EDGES + (None,)
+    buckets = []
+    for lo, hi in zip(bounds, bounds[1:]):
+        cond = [f"{elapsed} >= {lo}" if lo is not None else "1", f"{elapsed} < {hi}" if hi is not None else "1"]
+        buckets.append(f"SUM(CASE WHEN {' AND '.join(cond)} THEN 1 ELSE 0 END)")
+    aggregates = ("COUNT(*), SUM(correct), SUM(CASE WHEN choice < 0 THEN 1 ELSE 0 END), "
+                  f"TOTAL(elapsed), {', '.join(buckets)}")
+    cols = ", ".join(COUNTER_COLUMNS)
+    with conn:
+        conn.execute("DELETE FROM question_stats")
+        conn.execute("DELETE FROM category_stats")
+        conn.execute(f"INSERT INTO question_stats (question_id, {cols}) "
+                     f"SELECT question_id, {aggregates} FROM attempts GROUP BY question_id")
+        conn.execute(f"INSERT INTO category_stats (category, {cols}) "
+                     f"SELECT category, {aggregates} FROM attempts GROUP BY category")
+
+
+def read_stats(db_path: str, table: str) -> Stats:
+    """集計テーブルを読む（table は question_stats / category_stats）"""
+    key = {"question_stats": "question_id", "category_stats": "category"}[table]
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            rows = conn.execute(f"SELECT {key}, {', '.join(COUNTER_COLUMNS)} FROM {table}").fetchall()
+        finally:
+            conn.close()
+    except sqlite3.OperationalError:
+        rows = []  # まだ回答ログが無い
+    data = np.array([r[1:] for r in rows], dtype=float).reshape(len(rows), len(COUNTER_COLUMNS))
+    return Stats(
+        keys=[r[0] for r in rows],
+        attempts=data[:, 0].astype(np.int64),
+        correct=data[:, 1].astype(np.int64),
+        timeouts=data[:, 2].astype(np.int64),
+        seconds=data[:, 3],
+        hist=data[:, 4:].astype(np.int64),
+    )
@@ -0,0 +1,125 @@
+"""
+問題バンクの共有ストア：
+  プロセス内で1つだけ作り、全セッションで共有する（変更しない前提）。
+  セッション側は問題ID（int32配列）だけを持ち、本文はここから引く。
+  描画側は question(qid) で読込時に作った Question レコードを受け取る（pandas は使わない）。
+"""
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from spi_core.question import build_questions
+from spi_core.sampler import build_category_index
+from spi_core.scoring import NO_ANSWER
+
+if TYPE_CHECKING:  # pandas はコンパイル時（from_frame）だけ。起動・出題の経路では読み込まない
+    import pandas as pd
+
+
+# これ以下の件数（1セッション分など）は配列演算より dict を1件ずつ引く方が速い
+SMALL_LOOKUP = 64
+
+
+def _readonly(a: np.ndarray) -> np.ndarray:
+    a.flags.writeable = False
+    return a
+
+
+class QuestionStore:
+    """列ごとのタプルで問題を保持する不変ストア（問題IDはコンパイラが内容から決めた飛び飛びの整数）"""
+
+    __slots__ = ("ids", "digest", "fields", "by_category", "category_names", "category_code", "answer_index",
+                 "time_limit", "questions", "_columns", "_id_to_pos", "_mask", "_slot_ids", "_slot_pos", "_max_probe")
+
+    def __init__(self, ids: np.ndarray, columns: dict, digest: str = ""):
+        ids = _readonly(np.asarray(ids, dtype=np.int32))
+        self.ids = ids
+        self.digest = digest  # 元にしたソースのハッシュ（バンクの source_sha256。再開時に同じバンクか確かめる）
+        self.fields = tuple(columns)
+        self._columns = {name: tuple(values) for name, values in columns.items()}
+
+        # 問題ID → ストア上の位置：1問ずつは dict、配列でまとめて引くときは ID の下位ビットで引く
+        # ハッシュ表（ID は内容のハッシュなので下位ビットが散らばる。埋まっていたら次の枠へ）
+        self._id_to_pos = {qid: pos for pos, qid in enumerate(ids.tolist())}
+        size = 1 << max(4, (2 * len(ids)).bit_length())  # 半分以上は空ける
+        self._mask = size - 1
+        slot_ids, slot_pos, max_probe = [-1] * size, [-1] * size, 0
+        for pos, qid in enumerate(ids.tolist()):
+            slot, probe = qid & self._mask, 0
+            while slot_pos[slot] >= 0:
+                slot, probe = (slot + 1) & self._mask, probe + 1
+            slot_ids[slot], slot_pos[slot] = qid, pos
+            max_probe = max(max_probe, probe)
+        self._slot_ids = _readonly(np.array(slot_ids, dtype=np.int32))
+        self._slot_pos = _readonly(np.array(slot_pos, dtype=np.int32))
+        self._max_probe = max_probe
+
+        # カテゴリ → 問題ID配列（開始ボタンでの抽出はこれを引くだけ）
+        categories = self._columns.get("category", ("",) * len(ids))
+        self.by_category = build_category_index(ids, categories)
+        # 採点・集計用：カテゴリ番号と正解（コンパイル時に 0〜4 の整数にしたもの）を位置順の配列で持つ
+        self.category_names = tuple(self.by_category)
+        code = {name: i for i, name in enumerate(self.category_names)}
+        self.category_code = _readonly(
+            np.fromiter((code[c] for c in categories), dtype=np.int32, count=len(ids))
+        )
+        self.answer_index = _readonly(
+            np.asarray(self._columns.get("answer", (NO_ANSWER,) * len(ids)), dtype=np.int8)
+        )
+        # 問題ごとの制限時間（秒、設定なしは NaN）
+        self.time_limit = _readonly(
+            np.asarray(self._columns.get("time_limit", (np.nan,) * len(ids)), dtype=np.float32)
+        )
+        # 描画用のレコード（位置順）：読込時に1回だけ作る
+        self.questions = build_questions(ids, self._columns, self.answer_index, self.time_limit)
+
+    @classmethod
+    def from_frame(cls, df: "pd.DataFrame") -> "QuestionStore":
+        """load_questions の DataFrame から作る（index を問題IDとして使う）"""
+        return cls(df.index.to_numpy(), {c: df[c].tolist() for c in df.columns})
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, qid) -> bool:
+        return int(qid) in self._id_to_pos
+
+    def position(self, qid) -> int:
+        return self._id_to_pos[int(qid)]
+
+    def positions(self, ids) -> np.ndarray:
+        """問題ID配列 → 位置の配列（ループなし。ストアに無い ID は -1）"""
+        ids = np.asarray(ids, dtype=np.int32)
+        if ids.size <= SMALL_LOOKUP:
+            get = self._id_to_pos.get
+            return np.fromiter((get(qid, -1) for qid in ids.tolist()), dtype=np.int32, count=ids.size)
+        slot = ids & self._mask
+        pos = self._slot_pos[slot]
+        miss = np.flatnonzero(self._slot_ids[slot] != ids)
+        # 最初の枠で見つからなかったもの（衝突して後ろの枠に入ったもの）だけ次の枠を見る
+        for _ in range(self._max_probe):
+            if not len(miss):
+                break
+            slot[miss] = (slot[miss] + 1) & self._mask
+            pos[miss] = self._slot_pos[slot[miss]]
+            miss = miss[self._slot_ids[slot[miss]] != ids[miss]]
+        pos[miss] = -1
+        return pos
+
+    def column(self, field: str) -> tuple:
+        return self._columns[field]
+
+    def get(self, qid, field: str, default: str = "") -> str:
+        col = self._columns.get(field)
+        if col is None:
+            return default
+        return col[self.position(qid)]
+
+    def question(self, qid):
+        """描画用の Question レコード"""
+        return self.questions[self._id_to_pos[int(qid)]]
+
+    def row(self, qid) -> dict:
+        """1問分を列名の dict で返す（描画には question() を使う）"""
+        i = self.position(qid)
+        return {name: col[i] for name, col in self._columns.items()}